@@ -5,11 +5,87 @@ from typing import Optional
 
 from typing import Optional
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import copy
+import os
 
 import pandas as pd
 import numpy as np
+
+from pathlib import Path
+
+from clientHeatmap import band_spec
+from runHistory import RUNS_DIR, RunHistory
     
 class Cable(ABC):
+    # Channel layout; subclasses override with their connector order
+    order: list = []
+    # (name, channels) rows of the heatmap, concatenating to `order`
+    bands: list = []
+    # Area draw_bands lays the bands out in (tight_layout rect), below the title
+    layout_rect = [0, 0, 1, 0.92]
+
+    # Upper end of the leakage colour scale (pA); subclasses override
+    leakage_vmax = 1000
+
+    # Blue -> white -> red heatmap colours, evenly spaced from vmin to vmax
+    HEATMAP_COLORS = [
+        (0, 0, 1),       # deep blue
+        (0.3, 0.3, 1),   # intermediate blue
+        (0.6, 0.6, 1),   # light blue
+        (1, 1, 1),       # white
+        (1, 0.6, 0.6),   # light red
+        (1, 0.3, 0.3),   # intermediate red
+        (1, 0, 0)        # full red
+    ]
+
+    _cmap = None
+
+    @classmethod
+    def heatmap_cmap(cls):
+        """The HEATMAP_COLORS colormap, built on first use so importing a cable class stays cheap."""
+        if Cable._cmap is None:
+            from matplotlib.colors import LinearSegmentedColormap
+            nodes = np.linspace(0, 1, len(cls.HEATMAP_COLORS))
+            Cable._cmap = LinearSegmentedColormap.from_list(
+                "custom_red_extended", list(zip(nodes, cls.HEATMAP_COLORS))
+            )
+        return Cable._cmap
+
+    # Short matrix names accepted alongside the attribute names
+    MATRIX_ATTRS = {"leakage": "leakage", "1s": "leakage_1s"}
+
+    # Measurement attribute -> (name, unit, class attribute holding the top of its colour scale)
+    MEASUREMENT_KINDS = {
+        "leakage": ("Leakage", "pA", "leakage_vmax"),
+        "leakage_1s": ("1s Leakage", "pA", "leakage_vmax"),
+        "resistance": ("Resistance", "mOhm", "resistance_vmax"),
+        "inv_resistance": ("Inverted Resistance", "mOhm", "resistance_vmax"),
+        "continuity": ("Continuity", "mOhm", "continuity_vmax"),
+        "inv_continuity": ("Inverted Continuity", "mOhm", "continuity_vmax"),
+    }
+
+    # Upper ends of the resistance and continuity colour scales (mOhm)
+    resistance_vmax = 1000
+    continuity_vmax = 1000
+
+    # Storage dtype of measurement columns; "float32" halves their memory
+    measurement_dtype = os.environ.get("CABLE_MEASUREMENT_DTYPE", "float64")
+
+    # Heatmap views: raw values, measured / expected, change since the previous run,
+    # this test minus its paired test, deviation from the fleet's per-channel median
+    HEATMAP_MODES = ("Measured", "Margin", "Run change", "Difference", "Vs fleet median")
+
+    # Test each kind is compared with in "Difference" mode
+    PAIRED_KINDS = {
+        "leakage": "leakage_1s",
+        "leakage_1s": "leakage",
+        "resistance": "inv_resistance",
+        "inv_resistance": "resistance",
+        "continuity": "inv_continuity",
+        "inv_continuity": "continuity",
+    }
+
     def __init__(self, type, length, serial_number):
         self.serial_number = serial_number
         self.type = type
@@ -21,6 +97,20 @@ class Cable(ABC):
         self.inv_resistance: Optional[pd.DataFrame] = None
         self.continuity: Optional[pd.DataFrame] = None
         self.inv_continuity: Optional[pd.DataFrame] = None
+        self._ordered_cache: dict = {}
+        self.runs: dict = {}  # attribute -> RunHistory
+
+    def copy(self) -> "Cable":
+        """
+        Copy that can be updated without touching this cable: the DataFrames are
+        shared (ingestion replaces them rather than editing them), the caches
+        and run histories are not.
+        """
+        other = copy.copy(self)
+        other._ordered_cache = dict(self._ordered_cache)
+        # RunHistory.append re-reads its lists from disk before adding to them
+        other.runs = {attr: copy.copy(history) for attr, history in self.runs.items()}
+        return other
 
     def set_serial_number(self, sn: str) -> None:
         self.serial_number = sn
@@ -34,24 +124,306 @@ class Cable(ABC):
     def set_length(self, length: float) -> None:
         self.length = length
 
+    @classmethod
+    def channel_dtype(cls) -> pd.CategoricalDtype:
+        """Categorical dtype over `order`, so channel lookups, group-bys and merges run on integer codes."""
+        dtype = cls.__dict__.get("_channel_dtype")
+        if dtype is None:
+            dtype = pd.CategoricalDtype(categories=list(cls.order))
+            cls._channel_dtype = dtype
+        return dtype
+
+    def compact_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Stores `Channel` as `channel_dtype()` and the other columns as
+        `measurement_dtype`. The categories are always exactly `order`, so
+        channel codes stay positions in it: rows whose channel is not in
+        `order` are dropped and added to `df.attrs["unmapped_rows"]`.
+        """
+        unmapped_rows = df.attrs.get("unmapped_rows", 0)
+        channels = df["Channel"].astype(str).astype(self.channel_dtype())
+        known = channels.notna()
+        if not known.all():
+            df = df[known.to_numpy()].copy()
+            channels = channels[known]
+            unmapped_rows += int((~known).sum())
+        df["Channel"] = channels
+        df.attrs["unmapped_rows"] = unmapped_rows
+        for col in df.columns:
+            if col != "Channel":
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype(self.measurement_dtype)
+        return df
+
+    def ordered_vector(self, matrix_type, column: int = 1, fill: float = 0.0) -> Optional[np.ndarray]:
+        """
+        Returns one column of a test's DataFrame as a float array laid out in
+        `self.order`, or None if the cable has no data for that test.
+        `matrix_type` is "leakage", "1s" or any measurement attribute name.
+        Missing channels are set to `fill`. The vector is cached until the
+        DataFrame on the cable is replaced.
+        """
+        attr = self.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        df = getattr(self, attr, None)
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return None
+
+        key = (attr, column)
+        cached = self._ordered_cache.get(key)
+        if cached is None or cached[0] is not df:
+            channel = df["Channel"]
+            if isinstance(channel.dtype, pd.CategoricalDtype) and channel.cat.categories.equals(
+                self.channel_dtype().categories
+            ):
+                # Codes are positions in `order`: scatter instead of reindexing
+                measurement = [c for c in df.columns if c != "Channel"][column - 1]
+                codes = channel.cat.codes.to_numpy()
+                col = pd.to_numeric(df[measurement], errors="coerce").to_numpy(dtype=float)
+                keep = codes >= 0
+                values = np.full(len(self.order), np.nan)
+                # Reversed, so the first row of a duplicated channel wins
+                values[codes[keep][::-1]] = col[keep][::-1]
+            else:
+                values = (
+                    df.drop_duplicates(subset="Channel", keep="first")
+                      .set_index("Channel")
+                      .iloc[:, column - 1]
+                      .reindex(self.order)
+                )
+                values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+            cached = (df, values)
+            self._ordered_cache[key] = cached
+
+        values = cached[1]
+        return np.where(np.isnan(values), fill, values)
+
+    def cached_thumbnail(self, matrix_type) -> Optional[np.ndarray]:
+        """Thumbnail stored by `cache_thumbnail`, or None if missing or the data has changed since."""
+        attr = self.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        cached = self._ordered_cache.get((attr, "thumbnail"))
+        if cached is None or cached[0] is not getattr(self, attr, None):
+            return None
+        return cached[1]
+
+    def cache_thumbnail(self, matrix_type, image: np.ndarray) -> np.ndarray:
+        """Keeps a `thumbnails` image with the ordered vectors, until the DataFrame is replaced."""
+        attr = self.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        self._ordered_cache[(attr, "thumbnail")] = (getattr(self, attr, None), image)
+        return image
+
+    def ordered_frame(self, matrix_type) -> Optional[pd.DataFrame]:
+        """
+        A test's DataFrame laid out in `self.order`, one row per channel, with
+        NaN for missing channels. Built from the cached ordered vectors.
+        """
+        attr = self.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        df = getattr(self, attr, None)
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return None
+        ordered = pd.DataFrame({"Channel": pd.Categorical(self.order, dtype=self.channel_dtype())})
+        measurements = [c for c in df.columns if c != "Channel"]
+        for i, col in enumerate(measurements, start=1):
+            ordered[col] = self.ordered_vector(matrix_type, column=i, fill=np.nan)
+        return ordered
+
+    def create_matrix(self, matrix_type) -> Optional[pd.DataFrame]:
+        """
+        `ordered_frame` plus a `Value` column: the first measurement with
+        missing channels set to 0, as drawn by `draw_heatmap`. Leakage tests
+        also keep it under its old name, `Leakage`.
+        """
+        ordered = self.ordered_frame(matrix_type)
+        if ordered is None:
+            return None
+        ordered["Value"] = self.ordered_vector(matrix_type)
+        if self.kind(matrix_type)[1] == "pA":
+            ordered["Leakage"] = ordered["Value"]
+        return ordered
+
+    def draw_heatmap(self, matrix_type, mode: str = "Measured", fleet_median=None):
+        """(fig, ax) heatmap of any measurement kind, on that kind's scale."""
+        return self.draw_mode_values(self.heatmap_values(matrix_type, mode, fleet_median), mode, matrix_type)
+
+    def heatmap_spec(self, matrix_type) -> Optional[dict]:
+        """
+        JSON-serialisable alternative to `draw_heatmap` for browser-side rendering:
+        band layout, channel labels, values and colour stops. None without data.
+        """
+        return self.mode_spec(matrix_type, "Measured")
+
+    def margin_vector(self, matrix_type) -> Optional[np.ndarray]:
+        """
+        Measured / expected per channel, in `self.order`.
+        NaN where the channel is missing or has no expected value.
+        """
+        measured = self.ordered_vector(matrix_type, column=1, fill=np.nan)
+        expected = self.ordered_vector(matrix_type, column=2, fill=np.nan)
+        if measured is None or expected is None:
+            return None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(expected > 0, measured / expected, np.nan)
+
+    def margin_spec(self, matrix_type) -> Optional[dict]:
+        """Browser-side counterpart of `draw_heatmap(matrix_type, "Margin")`."""
+        return self.mode_spec(matrix_type, "Margin")
+
+    def difference_vector(self, matrix_type) -> Optional[np.ndarray]:
+        """
+        This test minus its PAIRED_KINDS partner per channel, in `self.order`
+        (e.g. 1s leakage - leakage). NaN where either is missing.
+        """
+        attr = self.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        values = self.ordered_vector(attr, fill=np.nan)
+        paired = self.ordered_vector(self.PAIRED_KINDS[attr], fill=np.nan)
+        if values is None or paired is None:
+            return None
+        return values - paired
+
+    def fleet_deviation(self, matrix_type, fleet_median) -> Optional[np.ndarray]:
+        """
+        Measured minus `fleet_median` per channel, where `fleet_median` is the
+        fleet's median vector for this test in `self.order` (see
+        `FleetStats.median`). NaN where either is missing.
+        """
+        values = self.ordered_vector(matrix_type, fill=np.nan)
+        if values is None or fleet_median is None:
+            return None
+        return values - np.asarray(fleet_median, dtype=float)
+
+    # ---------- run history ----------
+
+    def record_run(self, attr, folder, report_digest: str = "", source: str = "") -> bool:
+        """
+        Appends the current `attr` vector to the run history kept under
+        `folder`/runs (left out of the cable's ZIP download). Returns False if
+        that report was already recorded.
+        """
+        vector = self.ordered_vector(attr, fill=np.nan)
+        if vector is None:
+            return False
+        history = self.runs.get(attr)
+        if history is None:
+            history = RunHistory(Path(folder) / RUNS_DIR, attr, len(self.order))
+            self.runs[attr] = history
+        return history.append(vector, report_digest, source)
+
+    def run_history(self, matrix_type) -> Optional[RunHistory]:
+        return self.runs.get(self.MATRIX_ATTRS.get(matrix_type, matrix_type))
+
+    def run_vector(self, matrix_type, run: int = -1) -> Optional[np.ndarray]:
+        """Ordered vector of one recorded run (0 = first, -1 = latest), NaN where missing."""
+        history = self.run_history(matrix_type)
+        return None if history is None else history.run(run)
+
+    def run_delta(self, matrix_type, start: int = -2, end: int = -1) -> Optional[np.ndarray]:
+        """Run `end` minus run `start` per channel; None until there are two runs."""
+        history = self.run_history(matrix_type)
+        return None if history is None else history.delta(start, end)
+
+    # ---------- heatmap modes ----------
+
+    def heatmap_values(self, matrix_type, mode: str = "Measured", fleet_median=None) -> Optional[np.ndarray]:
+        """
+        Ordered vector behind a heatmap in `mode` (one of HEATMAP_MODES).
+        "Vs fleet median" needs the fleet's `fleet_median` vector for this test.
+        """
+        if mode == "Margin":
+            return self.margin_vector(matrix_type)
+        if mode == "Run change":
+            return self.run_delta(matrix_type)
+        if mode == "Difference":
+            return self.difference_vector(matrix_type)
+        if mode == "Vs fleet median":
+            return self.fleet_deviation(matrix_type, fleet_median)
+        return self.ordered_vector(matrix_type)
+
+    def draw_mode_values(self, values, mode: str = "Measured", matrix_type="leakage"):
+        """(fig, ax) for an already computed `heatmap_values` vector."""
+        label, vmin, vmax, title = self._mode_scale(mode, matrix_type)
+        return self.draw_bands(values, label=label, vmin=vmin, vmax=vmax, title=title)
+
+    @contextmanager
+    def mode_figure(self, values, mode: str = "Measured", matrix_type="leakage"):
+        """
+        Same picture as `draw_mode_values`, drawn into the figure template shared
+        by this class. The figure is locked while the block
+        runs; save it inside the block and do not close it.
+        """
+        from figureTemplate import get_template
+
+        label, vmin, vmax, title = self._mode_scale(mode, matrix_type)
+        with get_template(type(self), label, vmin, vmax).filled(values, title, label, vmin, vmax) as fig:
+            yield fig
+
+    def mode_png(self, values, mode: str = "Measured", dpi: int = 100, matrix_type="leakage") -> bytes:
+        """PNG of `draw_mode_values(values, mode, matrix_type)`, rendered through the figure template."""
+        from figureTemplate import get_template
+
+        label, vmin, vmax, title = self._mode_scale(mode, matrix_type)
+        return get_template(type(self), label, vmin, vmax).png(values, title, label, vmin, vmax, dpi)
+
+    def mode_spec(self, matrix_type, mode: str = "Measured", fleet_median=None) -> Optional[dict]:
+        """Browser-side heatmap spec for `mode`, or None if there are no values for it."""
+        values = self.heatmap_values(matrix_type, mode, fleet_median)
+        if values is None:
+            return None
+        return band_spec(self, values, *self._mode_scale(mode, matrix_type))
+
+    @classmethod
+    def kind(cls, matrix_type):
+        """(name, unit, vmax) of a measurement kind; `matrix_type` may be a short name."""
+        attr = cls.MATRIX_ATTRS.get(matrix_type, matrix_type)
+        try:
+            name, unit, vmax_attr = cls.MEASUREMENT_KINDS[attr]
+        except KeyError:
+            raise ValueError(f"Unknown measurement kind: {matrix_type}") from None
+        return name, unit, getattr(cls, vmax_attr)
+
+    def _mode_scale(self, mode: str, matrix_type="leakage"):
+        """(label, vmin, vmax, title) of the `matrix_type` heatmap for `mode`."""
+        name, unit, vmax = self.kind(matrix_type)
+        # Leakage keeps its original titles; other kinds are named in theirs
+        prefix = "" if name == "Leakage" else f"{name} "
+        if mode == "Margin":
+            return "Measured / Expected", 0.0, 2.0, f"{prefix}Margin heatmap for cable with SN: {self.serial_number}"
+        # Signed modes share a diverging scale centred on white at 0
+        limit = vmax / 2
+        if mode == "Run change":
+            return (
+                f"Change since previous run ({unit})",
+                -limit,
+                limit,
+                f"{prefix}Run-to-run change for cable with SN: {self.serial_number}",
+            )
+        if mode == "Difference":
+            paired = self.kind(self.PAIRED_KINDS[self.MATRIX_ATTRS.get(matrix_type, matrix_type)])[0]
+            return (
+                f"{name} - {paired} ({unit})",
+                -limit,
+                limit,
+                f"{name} - {paired} for cable with SN: {self.serial_number}",
+            )
+        if mode == "Vs fleet median":
+            return (
+                f"Deviation from fleet median ({unit})",
+                -limit,
+                limit,
+                f"{prefix}Deviation from {self.type} fleet median for cable with SN: {self.serial_number}",
+            )
+        return f"{name} ({unit})", 0.0, vmax, f"{prefix}Heatmap for cable with SN: {self.serial_number}"
+
+    def draw_leakage_values(self, values):
+        """Leakage heatmap from an already ordered vector (same output as `draw_heatmap`)."""
+        return self.draw_mode_values(values, "Measured")
+
 
     # ---------- Processing contract: subclasses must implement these ----------
 
-    @abstractmethod
-    def create_matrix(self, matrix_type) -> pd.DataFrame:
-        pass
     @abstractmethod
     def extract_channel(self) -> pd.DataFrame:
         pass
     @abstractmethod
-    def draw_heatmap(self, matrix_type):
-        pass
-    @abstractmethod
-    def create_matrix(self, matrix_type):
+    def draw_bands(self, values, label, vmin, vmax, title=None):
         pass
     
     def __str__(self):
         return f"Cable SN: {self.serial_number}\n"
-    def create_matrix(self, matrixData):
-        return None
-    
@@ -1,9 +1,4 @@
-import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
-
-from matplotlib.colors import LinearSegmentedColormap
 Top = [
     "F1","R1","F2","R2","F3","R3","F4","R4",
     "F5","R5","F6","R6","F7","R7","F8","R8",
@@ -91,9 +86,24 @@ colors = [
 
 
 nodes = [0.0, 1.0/6.0, 2.0/6.0, 3.0/6.0, 4.0/6.0, 5.0/6.0, 1.0]
-custom_cmap = LinearSegmentedColormap.from_list("custom_red_extended", list(zip(nodes, colors)))
+_custom_cmap = None
+
+
+def get_custom_cmap():
+    """Built on first use rather than at import."""
+    global _custom_cmap
+    if _custom_cmap is None:
+        from matplotlib.colors import LinearSegmentedColormap
+        _custom_cmap = LinearSegmentedColormap.from_list("custom_red_extended", list(zip(nodes, colors)))
+    return _custom_cmap
+
 
 def display_matrix(cable):
+    import streamlit as st
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    custom_cmap = get_custom_cmap()
     matrix = np.array(cable.matrix, dtype=np.float64)
     print(matrix)
     matrix1 = matrix[0].reshape(1, -1)  
@@ -1,10 +1,6 @@
 from Cable import Cable
 import re
-import pandas as pd 
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
 import numpy as np
-import seaborn as sns
 
 
 class Paradise(Cable):
@@ -26,6 +22,9 @@ class Paradise(Cable):
     Bottom = Bottom1 + Bottom2 + Bottom3
     #endregion
     order = Top1 + Top2 + Top3 + Bottom1 + Bottom2 + Bottom3 
+    leakage_vmax = 600
+    bands = [("Top", Top), ("Bottom", Bottom)]
+    layout_rect = [0, 0, 1, 0.90]
     def extract_channel(*texts):
         for t in texts:
             if not isinstance(t, str) or not t:
@@ -39,79 +38,43 @@ class Paradise(Cable):
         return None
     
     
-    def split_top_bottom(self, matrix_type):
-        ordered = self.create_matrix(matrix_type)
-
-        # Total counts
-        top_len = len(self.Top1) + len(self.Top2) + len(self.Top3)
-
-        leakage = ordered["Leakage"].to_numpy()
-
-        top_leakage = leakage[:top_len]
-        bottom_leakage = leakage[top_len:]
-
-        return top_leakage, bottom_leakage
-
-    def create_matrix(self, matrix_type): 
-        if(matrix_type == "leakage"):
-            df = self.leakage.copy()
-        elif(matrix_type == "1s"):
-            df = self.leakage_1s.copy()
-        df_idx = (
-            df.drop_duplicates(subset="Channel", keep="first")
-            .set_index("Channel")
-        )
-
-        ordered = df_idx.reindex(self.order)
-
-        ordered = ordered.reset_index()
-
-
-        ordered["Leakage"] = pd.to_numeric(
-            ordered["Measured_pA"], errors="coerce"
-        ).fillna(0.0)
-        ordered["Leakage"] = ordered["Leakage"].astype(float)
-        return ordered
-
-    def draw_heatmap(self, matrix_type):
-        ordered = self.create_matrix(matrix_type)
-        colors = [
-        (0, 0, 1),       # deep blue
-        (0.3, 0.3, 1),   # intermediate blue
-        (0.6, 0.6, 1),   # light blue
-        (1, 1, 1),       # white
-        (1, 0.6, 0.6),   # light red
-        (1, 0.3, 0.3),   # intermediate red
-        (1, 0, 0)        # full red
-        ]
-        
-
-        nodes = np.linspace(0, 1, len(colors))
-        custom_cmap = LinearSegmentedColormap.from_list("custom_red_extended", list(zip(nodes, colors)))
-        #split matrix[leakage] into 2 arrays, one for the TOP channels and one for the BOTTOM channels 
+    def draw_bands(self, values, label, vmin, vmax, title=None):
+        """Draws a channel-ordered vector in the Top / Bottom layout."""
+        # Plotting libraries load on the first draw, not at import
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        custom_cmap = self.heatmap_cmap()
+        #split values into 2 arrays, one for the TOP channels and one for the BOTTOM channels 
         
-        top_leakage, bottom_leakage = self.split_top_bottom(matrix_type)
-        top_leakage = top_leakage.reshape(1, -1)  
-        bottom_leakage = bottom_leakage.reshape(1, -1)
+        values = np.asarray(values, dtype=float)
+        if len(values) != len(self.order):
+            raise ValueError(
+                f"Expected {len(self.order)} values from channel lists, got {len(values)}. "
+                "Ensure values are reordered to exactly Top1+Top2+Top3+Bottom."
+            )
+        top_len = len(self.Top)
+        top_leakage = values[:top_len].reshape(1, -1)  
+        bottom_leakage = values[top_len:].reshape(1, -1)
         fig, axes = plt.subplots(3, 1, figsize=(24, 8), 
                                 gridspec_kw={'height_ratios': [1, 0.1, 1]})
-        fig.suptitle(f'Heatmap for cable with SN: {self.serial_number}', fontsize=20)
+        fig.suptitle(title or f'Heatmap for cable with SN: {self.serial_number}', fontsize=20)
 
         # Plot first heatmap with color bar
     # Plot first heatmap
         sns.heatmap(top_leakage, ax=axes[0], cmap=custom_cmap, annot=False, square=False,
-                    xticklabels=self.Top, yticklabels=[''], cbar=True, cbar_kws={'label': 'Leakage(pA)'},
-                    vmin=0.0, vmax=600)
+                    xticklabels=self.Top, yticklabels=[''], cbar=True, cbar_kws={'label': label},
+                    vmin=vmin, vmax=vmax)
 
         # Leave middle subplot blank
         axes[1].axis('off')
 
         # Plot second heatmap
         sns.heatmap(bottom_leakage, ax=axes[2], cmap=custom_cmap, annot=False, square=False,
-                    xticklabels=self.Bottom, yticklabels=[''], cbar=True, cbar_kws={'label': 'Leakage(pA)'},
-                    vmin=0.0, vmax=600)
+                    xticklabels=self.Bottom, yticklabels=[''], cbar=True, cbar_kws={'label': label},
+                    vmin=vmin, vmax=vmax)
 
 
         # Adjust layout to make room for the title
-        plt.tight_layout(rect=[0, 0, 1, 0.90])
-        return fig, axes
+        plt.tight_layout(rect=self.layout_rect)
+        return fig, axes
\ No newline at end of file
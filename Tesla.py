@@ -1,10 +1,6 @@
 from Cable import Cable
 import re
-import matplotlib.pyplot as plt
-
-from matplotlib.colors import LinearSegmentedColormap
 import numpy as np
-import seaborn as sns
 
 class Tesla(Cable):
     #region order of channels 
@@ -79,6 +75,8 @@ class Tesla(Cable):
     #endregion
 
     order = Top + TopS + BottomS + Bottom
+    leakage_vmax = 1000
+    bands = [("Top", Top), ("TopS", TopS), ("BottomS", BottomS), ("Bottom", Bottom)]
 
     def extract_channel(*texts):
         for t in texts:
@@ -113,82 +111,28 @@ class Tesla(Cable):
         
         return "0"
     
-    def create_matrix(self, matrix_type): 
-        if(matrix_type == "leakage"):
-            df = self.leakage.copy()
-
-        elif(matrix_type == "1s"):
-            df = self.leakage_1s.copy()
-
-    
-        df_idx = (
-            df.drop_duplicates(subset="Channel", keep="first")
-            .set_index("Channel")
-        )
-        ordered = df_idx.reindex(self.order)
-        ordered = ordered.reset_index()
-        ordered["Leakage"] = ordered["Measured_pA"].fillna(0)
-        ordered["Leakage"] = ordered["Leakage"].astype(float)
-        return ordered
-    def split_top_bottom(self, matrix_type):
+    def draw_bands(self, values, label, vmin, vmax, title=None):
+        """Draws a channel-ordered vector in the Top / TopS / BottomS / Bottom layout."""
+        # Plotting libraries load on the first draw, not at import
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-        ordered = self.create_matrix(matrix_type)
+        custom_cmap = self.heatmap_cmap()
 
-        # Lengths
-        top_len     = len(self.Top)
-        topS_len    = len(self.TopS)
-        bottomS_len = len(self.BottomS)
-        bottom_len  = len(self.Bottom)
-
-        leakage = ordered["Leakage"].to_numpy()
-
-        # Cumulative indices
-        i0 = 0
-        i1 = i0 + top_len
-        i2 = i1 + topS_len
-        i3 = i2 + bottomS_len
-        i4 = i3 + bottom_len  # should equal len(leakage)
-
-        # Optional sanity check
-        if i4 != len(leakage):
+        values = np.asarray(values, dtype=float)
+        if len(values) != len(self.order):
             raise ValueError(
-                f"Expected {i4} rows from channel lists, got {len(leakage)} in ordered. "
-                "Ensure ordered is filtered/reordered to exactly Top+TopS+BottomS+Bottom."
+                f"Expected {len(self.order)} values from channel lists, got {len(values)}. "
+                "Ensure values are reordered to exactly Top+TopS+BottomS+Bottom."
             )
-
-        # Proper slices
-        top_leakage      = leakage[i0:i1]
-        topS_leakage     = leakage[i1:i2]
-        bottomS_leakage  = leakage[i2:i3]
-        bottom_leakage   = leakage[i3:i4]
-
-
-        return top_leakage, topS_leakage, bottomS_leakage, bottom_leakage
-    
-    def draw_heatmap(self, matrix_type):
-        ordered = self.create_matrix(matrix_type)
-        colors = [
-        (0, 0, 1),       # deep blue
-        (0.3, 0.3, 1),   # intermediate blue
-        (0.6, 0.6, 1),   # light blue
-        (1, 1, 1),       # white
-        (1, 0.6, 0.6),   # light red
-        (1, 0.3, 0.3),   # intermediate red
-        (1, 0, 0)        # full red
-        ]
-        
-
-
-        nodes = np.linspace(0, 1, len(colors))
-        custom_cmap = LinearSegmentedColormap.from_list("custom_red_extended", list(zip(nodes, colors)))
-
-        top_leakage, topS_leakage, bottomS_leakage, bottom_leakage = self.split_top_bottom(matrix_type)
-
-
-        top_leakage = top_leakage.reshape(1, -1)  
-        bottom_leakage = bottom_leakage.reshape(1, -1)
-        topS_leakage = topS_leakage.reshape(1, -1)  
-        bottomS_leakage = bottomS_leakage.reshape(1, -1)
+        i1 = len(self.Top)
+        i2 = i1 + len(self.TopS)
+        i3 = i2 + len(self.BottomS)
+
+        top_leakage = values[:i1].reshape(1, -1)  
+        topS_leakage = values[i1:i2].reshape(1, -1)  
+        bottomS_leakage = values[i2:i3].reshape(1, -1)
+        bottom_leakage = values[i3:].reshape(1, -1)
         
         fig, axes = plt.subplots(
             nrows=5,
@@ -200,7 +144,7 @@ class Tesla(Cable):
         )
         
         fig.suptitle(
-            f'Heatmap for cable with SN: {self.serial_number}',
+            title or f'Heatmap for cable with SN: {self.serial_number}',
             fontsize=20
         )
         
@@ -213,9 +157,9 @@ class Tesla(Cable):
             xticklabels=self.Top,
             yticklabels=['Top'],
             cbar=True,
-            cbar_kws={'label': 'Leakage (pA)'},
-            vmin=0.0,
-            vmax=1000
+            cbar_kws={'label': label},
+            vmin=vmin,
+            vmax=vmax
         )
         
         sns.heatmap(
@@ -227,9 +171,9 @@ class Tesla(Cable):
             xticklabels=self.TopS,   # shared X visually
             yticklabels=['TopS'],
             cbar=True,
-            cbar_kws={'label': 'Leakage (pA)'},
-            vmin=0.0,
-            vmax=1000
+            cbar_kws={'label': label},
+            vmin=vmin,
+            vmax=vmax
         )
         
         axes[2].axis('off')
@@ -243,9 +187,9 @@ class Tesla(Cable):
             xticklabels=self.BottomS,
             yticklabels=['BottomS'],
             cbar=True,
-            cbar_kws={'label': 'Leakage(pA)'},
-            vmin=0.0,
-            vmax=1000
+            cbar_kws={'label': label},
+            vmin=vmin,
+            vmax=vmax
         )
         
         sns.heatmap(
@@ -257,9 +201,9 @@ class Tesla(Cable):
             xticklabels=self.Bottom,
             yticklabels=['Bottom'],
             cbar=True,
-            cbar_kws={'label': 'Leakage (pA)'},
-            vmin=0.0,
-            vmax=1000
+            cbar_kws={'label': label},
+            vmin=vmin,
+            vmax=vmax
         )
 
         axes[0].xaxis.tick_top()
@@ -281,7 +225,7 @@ class Tesla(Cable):
             ax.tick_params(axis='x', labelrotation=90)
 
 
-        plt.tight_layout(rect=[0, 0, 1, 0.92])
+        plt.tight_layout(rect=self.layout_rect)
 
         return fig, axes
 
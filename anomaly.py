@@ -0,0 +1,128 @@
+"""
+Outlier-channel detection against a per-channel fleet baseline.
+
+The baseline is the per-channel median and MAD of a fleet matrix
+(cables × channels in class order). Every cable is scored in one vectorized
+pass with the robust z-score 0.6745 * (x - median) / MAD.
+"""
+import numpy as np
+import pandas as pd
+
+from fleetStats import fleet_matrix
+
+DEFAULT_THRESHOLD = 3.5
+ANOMALY_KINDS = ("leakage", "resistance")
+
+
+class FleetBaseline:
+    """
+    Per-channel median and MAD for one cable type and measurement, plus the
+    scale used instead of the MAD where it is zero.
+    """
+
+    def __init__(self, channels, median, mad, count=None, fallback_scale=None):
+        self.channels = list(channels)
+        self.median = np.asarray(median, dtype=float)
+        self.mad = np.asarray(mad, dtype=float)
+        self.count = np.zeros(len(self.channels), dtype=np.int64) if count is None else np.asarray(count)
+        self.fallback_scale = (
+            np.zeros(len(self.channels)) if fallback_scale is None else np.asarray(fallback_scale, dtype=float)
+        )
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, channels):
+        """Compute the baseline from a cables × channels matrix (NaN = missing)."""
+        median = np.nanmedian(matrix, axis=0)
+        deviation = np.abs(matrix - median)
+        mad = np.nanmedian(deviation, axis=0)
+        # Mean absolute deviation scale, for channels whose MAD is zero
+        fallback_scale = np.nanmean(deviation, axis=0) * 1.2533
+        return cls(channels, median, mad, (~np.isnan(matrix)).sum(axis=0), fallback_scale)
+
+    @classmethod
+    def from_cables(cls, cables: dict, cable_type: str, matrix_type: str):
+        """Baseline over every `cable_type` cable, or None if there is no data."""
+        _, matrix, channels = fleet_matrix(cables, cable_type, matrix_type)
+        if matrix is None:
+            return None
+        return cls.from_matrix(matrix, channels)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Channel": self.channels,
+            "Count": self.count,
+            "Median": self.median,
+            "MAD": self.mad,
+        })
+
+    def robust_z(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Robust z-scores for a cables × channels matrix.
+        Channels with zero MAD fall back to the fleet's mean absolute deviation
+        scale, so a single deviating value on an otherwise constant channel
+        still scores, and the same cable scores the same in any batch.
+        """
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+        scale = self.mad / 0.6745
+        scale = np.where(scale > 0, scale, self.fallback_scale)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (matrix - self.median) / scale
+        return np.where(np.isfinite(z), z, 0.0)
+
+
+def score_matrix(matrix: np.ndarray, baseline: FleetBaseline, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Score a cables × channels matrix against `baseline`.
+    Returns (z, flagged, score) where flagged = |z| > threshold and score is the
+    largest |z| per cable.
+    """
+    z = baseline.robust_z(matrix)
+    abs_z = np.abs(z)
+    return z, abs_z > threshold, abs_z.max(axis=1)
+
+
+def anomaly_table(
+    cables: dict,
+    cable_type: str,
+    baselines: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    max_listed: int = 5,
+) -> pd.DataFrame:
+    """
+    One row per `cable_type` cable with a score and flagged-channel count per
+    measurement in `baselines` ({matrix_type: FleetBaseline}).
+    "Anomaly Score" is the highest score across measurements.
+    """
+    table = None
+    for matrix_type, baseline in baselines.items():
+        if baseline is None:
+            continue
+        serials, matrix, channels = fleet_matrix(cables, cable_type, matrix_type)
+        if matrix is None:
+            continue
+
+        z, flagged, score = score_matrix(matrix, baseline, threshold)
+
+        # Worst channels first, limited to max_listed per cable
+        worst = np.argsort(-np.abs(z), axis=1)[:, :max_listed]
+        names = np.asarray(channels, dtype=object)
+        listed = [
+            ", ".join(names[row][flagged[i, row]])
+            for i, row in enumerate(worst)
+        ]
+
+        label = matrix_type.replace("_", " ").title()
+        part = pd.DataFrame({
+            "Serial Number": serials,
+            f"{label} Score": score,
+            f"{label} Flagged": flagged.sum(axis=1),
+            f"{label} Channels": listed,
+        })
+        table = part if table is None else table.merge(part, on="Serial Number", how="outer")
+
+    if table is None:
+        return pd.DataFrame(columns=["Serial Number", "Anomaly Score"])
+
+    score_cols = [c for c in table.columns if c.endswith(" Score")]
+    table.insert(1, "Anomaly Score", table[score_cols].max(axis=1))
+    return table.sort_values("Anomaly Score", ascending=False, ignore_index=True)
@@ -0,0 +1,335 @@
+"""
+Standalone HTTP API for heatmaps and master tables, for MES integration.
+
+    python api.py [--host 0.0.0.0] [--port 8502]
+
+Endpoints
+    POST /reports?name=<report file name>     body: raw report CSV
+    GET  /cables                              JSON list of cables
+    GET  /cables/search?prefix=&type=&length=&start=&end=&limit=
+                                              indexed cables by serial prefix / range
+    GET  /cables/<serial>/files               indexed output folder and filtered CSVs
+    GET  /cables/<serial>/heatmap/<kind>.png  kind: leakage | 1s | resistance | ...
+                                              (?mode=margin|delta|difference|fleet)
+    GET  /cables/<serial>/heatmap/<kind>.json browser heatmap spec (same modes)
+    GET  /master/<type>/<attr>.<ext>          master table, ext: csv | parquet | xlsx
+                                              e.g. /master/Tesla/leakage.csv
+
+Requests are served on one thread each. Heatmaps are cached in an
+ArtifactStore keyed on the data they were built from; PNGs are rendered in
+the shared worker-process pool, because pyplot is not thread-safe. Master
+files are streamed as chunked responses while `export_master` writes them,
+so a large table is never held whole in memory.
+"""
+import argparse
+import io
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from artifactStore import ArtifactStore, digest
+from Cable import Cable
+from fleetStats import FleetStats, fleet_matrix, sync_fleet_stats
+from masterData import (
+    EXCEL_MAX_COLUMNS,
+    EXPORT_FORMATS,
+    build_master_dataframe,
+    export_formats,
+    export_master,
+)
+from renderService import get_render_service, heatmap_job
+from serialIndex import get_serial_index
+from uploadData import ingest_report
+
+HEATMAP_KINDS = ("1s", *Cable.MEASUREMENT_KINDS)
+# ?mode= values -> Cable.HEATMAP_MODES
+API_MODES = {
+    "measured": "Measured",
+    "margin": "Margin",
+    "delta": "Run change",
+    "difference": "Difference",
+    "fleet": "Vs fleet median",
+}
+# Master file extension -> masterData.EXPORT_FORMATS name
+MASTER_EXTENSIONS = {ext: name for name, (ext, _, _) in EXPORT_FORMATS.items()}
+
+
+# Bytes gathered before a chunk of a streamed response is sent
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CableService:
+    """Shared state behind the API: the cables, a version counter and the response cache."""
+
+    def __init__(self, budget_mb: float = 512, index=None):
+        self.cables = {}
+        self.version = 0
+        self._ingested = []  # serial number ingested by each version
+        self.store = ArtifactStore(budget_mb)
+        self.index = index if index is not None else get_serial_index()
+        self._fleet = {}  # (cable type, attr) -> (version, FleetStats, median vector)
+        self._masters = {}  # (cable type, attr) -> (version, master DataFrame)
+        self._lock = threading.RLock()
+
+    def ingest(self, name: str, body: bytes) -> dict:
+        with self._lock:
+            cable = ingest_report(self.cables, name, io.BytesIO(body), self.index)
+            if cable is None:
+                raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY, f"No recognised serial number in '{name}'")
+            self._ingested.append(cable.serial_number)
+            self.version += 1
+            return self._describe(cable)
+
+    def list_cables(self) -> list:
+        with self._lock:
+            return [self._describe(cable) for cable in self.cables.values()]
+
+    def search(self, query: dict) -> list:
+        """Indexed cables (every one ever processed, not only this server's) matching the query string."""
+        def arg(name):
+            return query.get(name, [None])[0]
+
+        try:
+            length = int(arg("length")) if arg("length") else None
+            limit = int(arg("limit") or 1000)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "length and limit must be integers") from None
+        return self.index.search(
+            arg("prefix") or "", cable_type=arg("type"), length=length, start=arg("start"), end=arg("end"), limit=limit
+        )
+
+    def cable_files(self, serial: str) -> dict:
+        entry = self.index.lookup(serial)
+        if entry is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Cable '{serial}' is not indexed")
+        return entry
+
+    def cable(self, serial: str):
+        with self._lock:
+            cable = self.cables.get(serial)
+        if cable is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown cable '{serial}'")
+        return cable
+
+    def fleet_median(self, cable_type: str, kind: str):
+        """Per-channel median of `kind` over this server's `cable_type` cables, refreshed after ingests."""
+        attr = Cable.MATRIX_ATTRS.get(kind, kind)
+        with self._lock:
+            version, stats, median = self._fleet.get((cable_type, attr), (None, None, None))
+            if version != self.version:
+                if stats is None:
+                    _, _, channels = fleet_matrix(self.cables, cable_type, attr)
+                    if channels is None:
+                        return None
+                    stats = FleetStats(channels)
+                    sync_fleet_stats(stats, self.cables, cable_type, attr)
+                else:
+                    # Only the cables ingested since the last sync
+                    changed = set(self._ingested[version:self.version])
+                    sync_fleet_stats(stats, self.cables, cable_type, attr, changed)
+                median = stats.median()
+                self._fleet[(cable_type, attr)] = (self.version, stats, median)
+            return median
+
+    def heatmap_png(self, serial: str, kind: str, mode: str) -> bytes:
+        cable = self.cable(serial)
+        fleet_median = self.fleet_median(cable.type, kind) if mode == "Vs fleet median" else None
+        job = heatmap_job(cable, kind, mode, fleet_median)
+        if job is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No {kind} data for '{serial}'")
+        key, _ = job
+        png = self.store.get(key)
+        if png is None:
+            for key, png in get_render_service().render_many([job]):
+                self.store.put(key, png)
+        return png
+
+    def heatmap_json(self, serial: str, kind: str, mode: str) -> bytes:
+        cable = self.cable(serial)
+        fleet_median = self.fleet_median(cable.type, kind) if mode == "Vs fleet median" else None
+        values = cable.heatmap_values(kind, mode, fleet_median)
+        if values is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No {kind} data for '{serial}'")
+
+        def build():
+            spec = cable.mode_spec(kind, mode, fleet_median)
+            return json.dumps(spec, separators=(",", ":")).encode("utf-8")
+
+        return self.store.get_or_create(("spec", serial, kind, mode, digest(values)), build)
+
+    def master_file(self, cable_type: str, attr: str, fmt: str = "CSV"):
+        """
+        The master table as `fmt`, as a callable that writes it to a binary
+        file object chunk by chunk with `export_master`. The table itself is
+        kept until the next ingest.
+        """
+        with self._lock:
+            version, master_df = self._masters.get((cable_type, attr), (None, None))
+            if version != self.version:
+                master_df, err = build_master_dataframe(self.cables, cable_type=cable_type, attr_name=attr)
+                if err:
+                    raise ApiError(HTTPStatus.NOT_FOUND, err)
+                self._masters[(cable_type, attr)] = (self.version, master_df)
+        # Checked before streaming starts: once headers are sent the status cannot change
+        if fmt == "Excel" and master_df.shape[1] > EXCEL_MAX_COLUMNS:
+            raise ApiError(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                f"{master_df.shape[1] - 1} cables do not fit in one Excel sheet; request .csv or .parquet",
+            )
+        return lambda out: export_master(master_df, out, fmt)
+
+    @staticmethod
+    def _describe(cable) -> dict:
+        tests = [
+            attr for attr in Cable.MEASUREMENT_KINDS
+            if getattr(cable, attr, None) is not None
+        ]
+        return {"serial": cable.serial_number, "type": cable.type, "length": cable.length, "tests": tests}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    service: CableService = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def _dispatch(self, route):
+        try:
+            status, content_type, body = route(urlparse(self.path))
+        except ApiError as exc:
+            status, content_type = exc.status, "application/json"
+            body = json.dumps({"error": str(exc)}).encode("utf-8")
+        except Exception as exc:
+            status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json"
+            body = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode("utf-8")
+        self._send(status, content_type, body)
+
+    def _get(self, url):
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+        mode = API_MODES.get(query.get("mode", [""])[0].lower(), "Measured")
+
+        if parts == ["cables"]:
+            return HTTPStatus.OK, "application/json", json.dumps(self.service.list_cables()).encode("utf-8")
+
+        if parts == ["cables", "search"]:
+            return HTTPStatus.OK, "application/json", json.dumps(self.service.search(query)).encode("utf-8")
+
+        if len(parts) == 3 and parts[0] == "cables" and parts[2] == "files":
+            return HTTPStatus.OK, "application/json", json.dumps(self.service.cable_files(parts[1])).encode("utf-8")
+
+        if len(parts) == 4 and parts[0] == "cables" and parts[2] == "heatmap":
+            kind, _, ext = parts[3].rpartition(".")
+            if kind not in HEATMAP_KINDS:
+                raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown heatmap kind '{kind}'")
+            if ext == "png":
+                return HTTPStatus.OK, "image/png", self.service.heatmap_png(parts[1], kind, mode)
+            if ext == "json":
+                return HTTPStatus.OK, "application/json", self.service.heatmap_json(parts[1], kind, mode)
+
+        if len(parts) == 3 and parts[0] == "master":
+            attr, _, ext = parts[2].rpartition(".")
+            fmt = MASTER_EXTENSIONS.get(ext)
+            if fmt is None or fmt not in export_formats():
+                raise ApiError(HTTPStatus.NOT_FOUND, f"Unsupported master format '.{ext}'")
+            return HTTPStatus.OK, EXPORT_FORMATS[fmt][1], self.service.master_file(parts[1], attr, fmt)
+
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {url.path}")
+
+    def _post(self, url):
+        if url.path.rstrip("/") != "/reports":
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {url.path}")
+        name = parse_qs(url.query).get("name", [self.headers.get("X-Filename", "")])[0]
+        if not name:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Pass the report file name as ?name= or X-Filename")
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        return HTTPStatus.CREATED, "application/json", json.dumps(self.service.ingest(name, body)).encode("utf-8")
+
+    def _send(self, status, content_type, body):
+        """Send `body` (bytes, or a callable that writes the body to a file object, sent chunked)."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if not callable(body):
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        out = io.BufferedWriter(_ChunkedWriter(self.wfile), STREAM_CHUNK_BYTES)
+        try:
+            body(out)
+            out.flush()
+        except Exception:
+            # Too late for an error status: drop the connection so the body is visibly cut short
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _ChunkedWriter(io.RawIOBase):
+    """Write-only, unseekable stream sending each write as one HTTP/1.1 chunk."""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            self._wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self._written += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._written
+
+
+def make_server(host="127.0.0.1", port=8502, service=None) -> ThreadingHTTPServer:
+    """Server bound to (host, port); port 0 picks a free port."""
+    handler = type("BoundApiHandler", (ApiHandler,), {"service": service or CableService()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API for cable heatmaps and master tables")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--cache-mb", type=float, default=512, help="Response cache budget")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, CableService(args.cache_mb))
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        get_render_service().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,116 @@
 import streamlit as st
-import re
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 from Cable import Cable
-from Heatmap import display_matrix  
-from uploadData import process_csv
+from uploadData import create_cable
+from ingestJob import IngestJob
 import os
-from Tesla import Tesla
-from Paradise import Paradise
+from fleetStats import FleetStats, fleet_matrix, sync_fleet_stats
+from crosstalk import draw_correlation_heatmap, fleet_correlation, top_pairs
+from clientHeatmap import to_vega_lite
+from margins import cable_pass_rates, channel_pass_rates, margin_matrix
+from channelCoverage import channel_coverage, coverage_summary
+from anomaly import ANOMALY_KINDS, DEFAULT_THRESHOLD, FleetBaseline, anomaly_table
+from artifactStore import ArtifactStore, digest, figure_to_png
+from renderService import get_render_service, heatmap_job
+from fleetReport import write_fleet_report
+from thumbnails import cable_thumbnails
+from serialIndex import get_serial_index
+from masterData import (
+    EXPORT_FORMATS,
+    build_zip_for_cable,
+    cable_folder,
+    export_formats,
+    folder_signature,
+    master_export_bytes,
+)
 
 
-import os
-import io
-import zipfile
+import time
+import tempfile
 
 def _nice_label(attr_name: str) -> str:
     return attr_name.replace("_", " ").title()
 
 
-import io
+def get_artifact_store() -> ArtifactStore:
+    """Per-session LRU store for heatmap PNGs, master CSVs and ZIPs."""
+    store = st.session_state.get("artifacts")
+    if store is None:
+        store = ArtifactStore()
+        st.session_state["artifacts"] = store
+    return store
+
+
+INGEST_REFRESH_SECONDS = 1.0
+# Full-page redraws while ingesting compete with the parser, so they are spaced out
+INGEST_PAGE_REFRESH_SECONDS = 5.0
+
+
+def get_ingest_job(uploaded_files) -> IngestJob:
+    """
+    The session's background ingestion job, with any new uploads queued.
+    Uploads already parsed are not parsed again on reruns; if any were
+    removed from the uploader, the old job is cancelled and ingestion starts
+    over with a fresh one.
+    """
+    job = st.session_state.get("ingest_job")
+    if job is None or not job.covers(uploaded_files):
+        if job is not None:
+            # Stop its worker first: both would write the same cable folders and run logs
+            job.cancel()
+        job = IngestJob()
+        st.session_state["ingest_job"] = job
+    job.submit(uploaded_files)
+    return job
+
+
+def render_ingest_progress(job: IngestJob, drawn_version: int, drawn_at: float):
+    """
+    Progress of the ingestion job. Run as a ticking fragment while the job is
+    busy; ticks reuse the `drawn_version` and `drawn_at` of the last full run,
+    so when more cables have been published since, the whole page reruns to
+    show them: straight away for the first cables and when the job finishes,
+    otherwise at most every INGEST_PAGE_REFRESH_SECONDS.
+    """
+    progress = job.progress()
+    if job.running:
+        eta = progress["eta_seconds"]
+        st.progress(
+            progress["done"] / progress["total"],
+            text=f"Processing {progress['done']}/{progress['total']} files · "
+                 f"{progress['files_per_second']:.1f} files/s · "
+                 f"ETA {'—' if eta is None else f'{eta:.0f}s'}",
+        )
+    else:
+        st.caption(
+            f"Processed {progress['total']} files in {progress['seconds']:.1f}s "
+            f"({progress['files_per_second']:.1f} files/s)"
+        )
+
+    if job.version != drawn_version and (
+        drawn_version == 0
+        or not job.running
+        or time.monotonic() - drawn_at >= INGEST_PAGE_REFRESH_SECONDS
+    ):
+        st.rerun()
+
 
+@st.fragment
 def render_group_of_six_buttons(
     cables: dict,
     cable_type: str,
     attr_names: list,
     group_key: str,
+    export_format: str = "CSV",
 ):
     """
-    Renders 6 buttons (2 rows × 3 cols).
-    Each button:
-      • starts as "Generate <attr>"
-      • becomes "Download <attr>" after generation
+    Renders 6 download buttons (2 rows × 3 cols), one per master table.
+    Downloads are deferred: the master table is only built, and written in
+    row chunks as `export_format`, when its button is clicked, so nothing
+    is serialised or kept in session state until then.
     """
+    extension, mime, _ = EXPORT_FORMATS[export_format]
 
     # Ensure fixed layout
     attr_names = (attr_names + [None] * 6)[:6]
@@ -57,175 +136,519 @@ def render_group_of_six_buttons(
 
         nice_label = attr.replace("_", " ").title()
         state_key = f"{group_key}_{attr}"
-        csv_key   = f"csv_{state_key}"
-        ready_key = f"ready_{state_key}"
-
-        disabled = not has_data(attr)
-        if st.session_state.get(ready_key, False):
-            col.download_button(
-                label=f"Download {nice_label}",
-                data=st.session_state[csv_key],
-                file_name=f"{cable_type.lower()}_{attr}.csv",
+
+        col.download_button(
+            label=f"Download {nice_label}",
+            data=lambda attr=attr: master_export_bytes(cables, cable_type, attr, export_format),
+            file_name=f"{cable_type.lower()}_{attr}.{extension}",
+            mime=mime,
+            key=f"dl_{state_key}",
+            disabled=not has_data(attr),
+            on_click="ignore",
+        )
+
+
+def get_fleet_stats(cables: dict, cable_type: str, attr: str):
+    """
+    The session's FleetStats for one cable type and test, synced with `cables`,
+    or None if no cable has that data. Shared by the statistics table and the
+    "Vs fleet median" heatmaps. After the first build only the cables the
+    ingest job published since the last sync are merged in.
+    """
+    stats_key = f"fleet_stats_{cable_type.lower()}_{attr}"
+    job = st.session_state.get("ingest_job")
+    version = st.session_state.get("cables_version", 0)
+    synced = st.session_state.get(stats_key)  # (job, version, FleetStats)
+    if synced is not None and synced[0] is job:
+        _, since, stats = synced
+        if since != version:
+            sync_fleet_stats(stats, cables, cable_type, attr, job.changed_serials(since, version))
+    else:
+        # First build, or a new job replaced the cables
+        _, _, channels = fleet_matrix(cables, cable_type, attr)
+        if channels is None:
+            return None
+        stats = FleetStats(channels)
+        sync_fleet_stats(stats, cables, cable_type, attr)
+    st.session_state[stats_key] = (job, version, stats)
+    return stats
+
+
+def fleet_medians(cables: dict, attrs: list) -> dict:
+    """{(cable type, attr): per-channel median vector} for every type present and test in `attrs`."""
+    medians = {}
+    for cable_type in sorted({cable.type for cable in cables.values()}):
+        for attr in attrs:
+            stats = get_fleet_stats(cables, cable_type, attr)
+            if stats is not None:
+                medians[(cable_type, attr)] = stats.median()
+    return medians
+
+
+def render_fleet_stats(cables: dict, cable_type: str, attr_names: list, group_key: str):
+    """
+    Per-channel fleet statistics for one cable type.
+    The FleetStats objects live in session state and are updated incrementally,
+    so only new or re-tested cables are merged on each rerun.
+    """
+    attrs = [
+        a for a in attr_names
+        if any(c.type == cable_type and c.ordered_vector(a) is not None for c in cables.values())
+    ]
+    if not attrs:
+        st.caption(f"No {cable_type} data yet.")
+        return
+
+    attr = st.selectbox(
+        "Measurement",
+        attrs,
+        format_func=_nice_label,
+        key=f"stats_attr_{group_key}",
+    )
+
+    stats = get_fleet_stats(cables, cable_type, attr)
+    table = stats.to_frame()
+    st.caption(f"{len(stats)} {cable_type} cables")
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    st.download_button(
+        label=f"Download {_nice_label(attr)} Statistics",
+        data=table.to_csv(index=False),
+        file_name=f"{cable_type.lower()}_{attr}_stats.csv",
+        mime="text/csv",
+        key=f"dl_stats_{group_key}",
+    )
+
+
+def render_anomaly_triage(cables: dict, cable_type: str, group_key: str) -> dict:
+    """
+    Scores every cable of `cable_type` against the stored fleet baseline.
+    The baseline is computed from the current fleet and kept in session state
+    until "Refresh Baseline" is pressed or the number of `cable_type` cables
+    changes, so it is not frozen on a partly ingested upload.
+    Returns {serial_number: anomaly score}.
+    """
+    baseline_key = f"baseline_{group_key}"
+    refresh = st.button("Refresh Baseline", key=f"refresh_{baseline_key}")
+    n_cables = sum(cable.type == cable_type for cable in cables.values())
+    built_for, baselines = st.session_state.get(baseline_key, (None, None))
+    if refresh or built_for != n_cables or not any(baselines.values()):
+        baselines = {
+            kind: FleetBaseline.from_cables(cables, cable_type, kind)
+            for kind in ANOMALY_KINDS
+        }
+        st.session_state[baseline_key] = (n_cables, baselines)
+
+    threshold = st.number_input(
+        "Robust z threshold",
+        min_value=1.0,
+        value=DEFAULT_THRESHOLD,
+        step=0.5,
+        key=f"threshold_{group_key}",
+    )
+    table = anomaly_table(cables, cable_type, baselines, threshold=threshold)
+    if table.empty:
+        st.caption(f"No {cable_type} data yet.")
+        return {}
+
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    for kind, baseline in baselines.items():
+        if baseline is not None:
+            st.download_button(
+                label=f"Download {_nice_label(kind)} Baseline",
+                data=baseline.to_frame().to_csv(index=False),
+                file_name=f"{cable_type.lower()}_{kind}_baseline.csv",
                 mime="text/csv",
-                key=f"dl_{state_key}",
+                key=f"dl_{baseline_key}_{kind}",
             )
-        else:
-            if col.button(
-                label=f"Generate {nice_label}",
-                disabled=disabled,
-                key=f"gen_{state_key}",
-            ):
-                df, err = build_master_dataframe(
-                    cables,
-                    cable_type=cable_type,
-                    attr_name=attr,
-                )
+    return dict(zip(table["Serial Number"], table["Anomaly Score"]))
 
-                if err:
-                    col.warning(err)
-                else:
-                    buf = io.StringIO()
-                    df.to_csv(buf, index=False)
-                    st.session_state[csv_key] = buf.getvalue()
-                    st.session_state[ready_key] = True
 
+def drop_stale_choice(key: str, options: list) -> None:
+    """
+    Forgets a keyed selectbox's value once it is no longer among `options`,
+    e.g. a cable type whose cables were replaced by a new upload.
+    """
+    if key in st.session_state and st.session_state[key] not in options:
+        del st.session_state[key]
 
 
+def render_crosstalk(cables: dict):
+    """
+    Channel × channel leakage correlation for one cable type, drawn in the
+    class band layout, with the most correlated pairs listed beside it.
+    """
+    types = sorted({cable.type for cable in cables.values()})
+    # Not drawn until cables arrive, so an empty ingest snapshot cannot pin it to None
+    if not types:
+        st.caption("No cables yet.")
+        return
+    drop_stale_choice("crosstalk_type", types)
+    cols = st.columns(3)
+    cable_type = cols[0].selectbox("Cable Type", types, key="crosstalk_type")
+    matrix_type = cols[1].selectbox(
+        "Measurement",
+        ["leakage", "1s"],
+        format_func=lambda m: "1s Leakage" if m == "1s" else "Leakage",
+        key="crosstalk_matrix",
+    )
+    if not cols[2].toggle("Show Crosstalk Matrix", key="crosstalk_show"):
+        return
+
+    corr, channels, n_cables = fleet_correlation(cables, cable_type, matrix_type)
+    if corr is None:
+        st.caption(f"No {cable_type} {matrix_type} data yet.")
+        return
+
+    cable_cls = type(next(c for c in cables.values() if c.type == cable_type))
+    png = get_artifact_store().get_or_create(
+        ("crosstalk", cable_type, matrix_type, digest(corr)),
+        lambda: figure_to_png(draw_correlation_heatmap(
+            corr,
+            cable_cls.bands,
+            f"{cable_type} {matrix_type} correlation ({n_cables} cables)",
+        )[0]),
+    )
+    plot_col, table_col = st.columns([3, 1])
+    plot_col.image(png, use_container_width=True)
+    table_col.dataframe(top_pairs(corr, channels), hide_index=True, use_container_width=True)
 
-import pandas as pd
 
-def build_master_dataframe(
-    cables: dict,
-    cable_type: str,
-    attr_name: str,
-):
+def render_margins(cables: dict, attr_names: list):
     """
-    Build a master DataFrame for the given cable type and data attribute.
-    - Deduplicates each cable's DataFrame by taking the max per key (first column).
-    - Merges all cables on the shared first column via outer join.
-    - If duplicates remain, collapses them by taking column-wise max per key.
+    Fleet pass-rate summaries from measured / expected ratios, per cable and
+    per channel, for one cable type and measurement.
     """
+    types = sorted({cable.type for cable in cables.values()})
+    if not types:
+        st.caption("No cables yet.")
+        return
+    drop_stale_choice("margin_type", types)
+    cols = st.columns(2)
+    cable_type = cols[0].selectbox("Cable Type", types, key="margin_type")
+    attr = cols[1].selectbox("Measurement", attr_names, format_func=_nice_label, key="margin_attr")
+
+    serials, ratio, passed, channels = margin_matrix(cables, cable_type, attr)
+    if ratio is None:
+        st.caption(f"No {cable_type} {_nice_label(attr).lower()} data yet.")
+        return
+
+    per_cable = cable_pass_rates(serials, ratio, passed)
+    per_channel = channel_pass_rates(channels, ratio, passed)
+    tested = per_cable["Channels Tested"].sum()
+    failed = per_cable["Channels Failed"].sum()
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("Cables", len(serials))
+    metric_cols[1].metric("Cables Passing", int((per_cable["Channels Failed"] == 0).sum()))
+    metric_cols[2].metric("Channel Pass Rate", f"{1 - failed / tested:.1%}" if tested else "—")
+
+    table_cols = st.columns(2)
+    table_cols[0].dataframe(per_cable, hide_index=True, use_container_width=True)
+    table_cols[1].dataframe(per_channel, hide_index=True, use_container_width=True)
+
+
+def render_coverage(cables: dict):
+    """
+    Missing, duplicated and unmapped channels per cable and test, against
+    each class's channel order, with a per-test fleet summary on top.
+    """
+    coverage = channel_coverage(cables)
+    if coverage.empty:
+        st.caption("No measurement data yet.")
+        return
+
+    summary = coverage_summary(coverage)
+    incomplete = coverage[~coverage["Complete"]]
+    metric_cols = st.columns(3)
+    metric_cols[0].metric("Cable Tests", len(coverage))
+    metric_cols[1].metric("With Gaps", len(incomplete))
+    metric_cols[2].metric("Unmapped Rows", int(coverage["Unmapped"].sum()))
+
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+    show_all = st.checkbox("Show complete cables too", key="coverage_show_all")
+    st.dataframe(coverage if show_all else incomplete, hide_index=True, use_container_width=True)
+    st.download_button(
+        "Download coverage CSV",
+        data=coverage.to_csv(index=False).encode("utf-8"),
+        file_name="channel_coverage.csv",
+        mime="text/csv",
+        key="download_coverage",
+        on_click="ignore",
+    )
 
-    dfs = []
-
-    for cable in cables.values():
-        if getattr(cable, "type", None) != cable_type:
-            continue
 
-        df = getattr(cable, attr_name, None)
-        if df is None or df.empty:
-            continue
+NO_HEATMAP_CAPTIONS = {
+    "Run change": "Only one run recorded",
+    "Difference": "Paired test missing",
+    "Vs fleet median": "No fleet data",
+}
 
-        # Work with first two columns: [shared_key, measurement]
-        tmp = df.iloc[:, :2].copy()
-        shared_col = tmp.columns[0]
-        meas_col   = tmp.columns[1]
 
-        # Ensure measurement is numeric for max calculation
-        tmp[meas_col] = pd.to_numeric(tmp[meas_col], errors="coerce")
+def show_heatmap(col, cable, matrix_type: str, mode: str, renderer: str, fleet_median=None):
+    """
+    Shows one heatmap in `col`, either as a server-rendered PNG or as a
+    Vega-Lite spec rendered in the browser.
+    Server PNGs are cached in the artifact store on the cable's data, and the
+    figure is closed as soon as it is encoded.
+    """
+    if renderer == "Interactive":
+        spec = cable.mode_spec(matrix_type, mode, fleet_median)
+        if spec is None:
+            col.caption(NO_HEATMAP_CAPTIONS.get(mode, "No data"))
+        else:
+            col.vega_lite_chart(to_vega_lite(spec), use_container_width=True)
+        return
 
-        # 1) Deduplicate within this cable: max per key
-        tmp = (
-            tmp.groupby(shared_col, as_index=False)
-               .agg({meas_col: "max"})
+    values = cable.heatmap_values(matrix_type, mode, fleet_median)
+    if values is None:
+        col.caption(NO_HEATMAP_CAPTIONS.get(mode, "No data"))
+    else:
+        png = get_artifact_store().get_or_create(
+            ("heatmap", cable.serial_number, matrix_type, mode, digest(values)),
+            lambda: cable.mode_png(values, mode, matrix_type=matrix_type),
         )
+        col.image(png, use_container_width=True)
 
-        # 2) Rename measurement column to the cable's serial number
-        tmp = tmp.rename(columns={meas_col: cable.serial_number})
 
-        dfs.append(tmp)
+def col_layout(n_tests: int) -> list:
+    """
+    Processed Cables column widths: four detail columns, the preview, one per
+    heatmap test (none if no test is selected), then the ZIP.
+    """
+    return [1, 1, 1, 1, 2] + ([8 / n_tests] * n_tests if n_tests else []) + [2]
 
-    if not dfs:
-        return None, f"No {attr_name} data found for {cable_type} cables."
 
-    # Use the first DataFrame's first column name as the join key
-    master_df = dfs[0].copy()
-    key_col = master_df.columns[0]
+SORT_OPTIONS = ["Upload order", "Anomaly score", "Max leakage"]
 
-    # 3) Merge all cables on shared key
-    for df_i in dfs[1:]:
-        # Align key column name if differs
-        if df_i.columns[0] != key_col:
-            df_i = df_i.rename(columns={df_i.columns[0]: key_col})
-        master_df = master_df.merge(df_i, on=key_col, how="outer")
 
-    # 4) If any duplicate keys exist post-merge, collapse by max per column
-    # Convert all measurement columns to numeric for max; leave key untouched
-    meas_cols = [c for c in master_df.columns if c != key_col]
-    for c in meas_cols:
-        master_df[c] = pd.to_numeric(master_df[c], errors="coerce")
+def max_leakage(cable) -> float:
+    """Highest leakage on any channel, from the cached ordered vector."""
+    vec = cable.ordered_vector("leakage", fill=np.nan)
+    if vec is None or np.isnan(vec).all():
+        return float("-inf")
+    return float(np.nanmax(vec))
 
-    master_df = (
-        master_df.groupby(key_col, as_index=False)
-                 .max(numeric_only=True)
-    )
 
-    # 5) Sort by the shared key (numeric if possible)
-    master_df[key_col] = pd.to_numeric(master_df[key_col], errors="ignore")
-    master_df = master_df.sort_values(by=key_col)
+def select_cables(
+    cables: dict,
+    serial_query: str = "",
+    types=None,
+    lengths=None,
+    sort_by: str = "Upload order",
+    anomaly_scores: dict = None,
+) -> list:
+    """
+    Filters and sorts cables for the Processed Cables table.
+    Empty `types` / `lengths` mean no filter on that field.
+    """
+    query = serial_query.strip().lower()
+    selected = [
+        cable for cable in cables.values()
+        if (not query or query in str(cable.serial_number).lower())
+        and (not types or cable.type in types)
+        and (not lengths or cable.length in lengths)
+    ]
+
+    if sort_by == "Anomaly score":
+        scores = anomaly_scores or {}
+        selected.sort(key=lambda c: scores.get(c.serial_number, float("-inf")), reverse=True)
+    elif sort_by == "Max leakage":
+        selected.sort(key=max_leakage, reverse=True)
+    return selected
+
+
+@st.fragment
+def render_cable_row(
+    cable,
+    anomaly_score,
+    thumbnail,
+    heatmap_tests: list,
+    heatmap_mode: str,
+    heatmap_renderer: str,
+    fleet_medians: dict = None,
+):
+    """
+    One row of the Processed Cables table: details, a leakage thumbnail
+    (RGB array or None), a heatmap toggle per test in `heatmap_tests` and
+    the ZIP download. `fleet_medians` ({(type, attr): vector}) backs the
+    "Vs fleet median" mode.
+    Runs as a fragment, so clicking a row's button only reruns that row.
+    """
+    cols = st.columns(col_layout(len(heatmap_tests)))
+
+    cols[0].markdown(cable.serial_number)
+    cols[1].markdown(cable.type)
+    cols[2].markdown(cable.length)
+    cols[3].markdown("—" if anomaly_score is None else f"{anomaly_score:.1f}")
+    if thumbnail is None:
+        cols[4].caption("No leakage data")
+    else:
+        cols[4].image(thumbnail, use_container_width=True)
 
-    return master_df, None
+    for col, attr in zip(cols[5:], heatmap_tests):
+        show_key = f"show_{attr}_{cable.serial_number}"
+        if show_key not in st.session_state:
+            st.session_state[show_key] = False
+
+        df = getattr(cable, attr, None)
+        has_data = isinstance(df, pd.DataFrame) and not df.empty
+        if col.button(
+            "Generate",
+            key=f"{attr}_{cable.serial_number}",
+            disabled=not has_data or st.session_state[show_key],
+        ):
+            st.session_state[show_key] = True
+
+        if st.session_state[show_key]:
+            fleet_median = (fleet_medians or {}).get((cable.type, attr))
+            show_heatmap(col, cable, attr, heatmap_mode, heatmap_renderer, fleet_median)
+
+    # ZIPs are cached on the folder's file sizes and mtimes, so unchanged folders are not re-compressed
+    target_dir, _ = cable_folder(cable)
+    zip_key = ("zip", cable.serial_number, folder_signature(target_dir) if target_dir else None)
+    zip_buf = get_artifact_store().get(zip_key)
+    zip_name_or_err = f"{cable.serial_number}_data.zip"
+    if zip_buf is None:
+        zip_buf, zip_name_or_err = build_zip_for_cable(
+            cable,
+            base_map={"Tesla": "teslaTemp", "Paradise": "paradiseTemp"},
+            temp_root="." 
+        )
+        if zip_buf:
+            zip_buf = get_artifact_store().put(zip_key, zip_buf.getvalue())
+
+    if zip_buf:
+        cols[-1].download_button(
+            label="Download ZIP",
+            data=zip_buf,
+            file_name=zip_name_or_err,   # this is the zip_name
+            mime="application/zip",
+            key=f"download_{cable.serial_number}",
+            on_click="ignore",
+        )
+
+    else:
+            # Show a disabled button with a tooltip-like note
+            cols[-1].button(
+                "Download ZIP",
+                key=f"download_disabled_{cable.serial_number}",
+                disabled=True,
+                help=str(zip_name_or_err)  # this is the error message
+            )
 
 
-def build_zip_for_cable(cable, base_map=None, temp_root="."):
+def render_all_heatmaps(cable_list: list, matrix_type: str, mode: str, fleet_medians: dict = None):
     """
-    Returns (zip_buffer, zip_name) if success, else (None, error_msg).
-    Expects folder structure:
-      TeslaTemp/<serial_number>/...
-      ParadiseTemp/<serial_number>/...
+    Renders every missing heatmap for `cable_list` in the worker-process pool,
+    filling the artifact store, and switches those heatmaps on in the table.
     """
-    if base_map is None:
-        base_map = {"Tesla": "teslaTemp", "Paradise": "paradiseTemp"}
+    store = get_artifact_store()
+    fleet_medians = fleet_medians or {}
+    jobs = [
+        heatmap_job(cable, matrix_type, mode, fleet_medians.get((cable.type, matrix_type)))
+        for cable in cable_list
+    ]
+    jobs = [job for job in jobs if job is not None and job[0] not in store]
 
-    base_dir = base_map.get(cable.type)
-    if not base_dir:
-        return None, f"Unknown cable_type '{cable.type}'"
-    
+    bar = st.progress(0.0, text=f"Rendering {len(jobs)} heatmaps…")
+    start = time.perf_counter()
 
-    if not cable.serial_number:
-        return None, "Missing serial number"
-    
-    length_folder = f"{cable.length}"
-    target_dir = os.path.join(
-        temp_root,
-        base_dir,
-        length_folder,
-        str(cable.serial_number)
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        bar.progress(done / total, text=f"Rendered {done}/{total} heatmaps ({rate:.1f}/s)")
+
+    for key, png in get_render_service().render_many(jobs, progress=progress):
+        store.put(key, png)
+    bar.empty()
+
+    for cable in cable_list:
+        st.session_state[f"show_{matrix_type}_{cable.serial_number}"] = True
+
+
+def render_fleet_report(cable_list: list):
+    """
+    Builds a multi-page PDF of leakage and 1s heatmaps for `cable_list`.
+    Pages are streamed to a temporary file while rendering; only the finished
+    PDF is kept, in the artifact store.
+    """
+    store = get_artifact_store()
+    report_key = ("report", digest(*[
+        (cable.serial_number, cable.ordered_vector("leakage"), cable.ordered_vector("1s"))
+        for cable in cable_list
+    ]))
+
+    cols = st.columns([1, 1, 3])
+    if cols[0].button("Build PDF Report", key="build_report", disabled=not cable_list):
+        bar = st.progress(0.0, text="Rendering report…")
+
+        def progress(pages, done, total):
+            bar.progress(done / total, text=f"{done}/{total} cables · {pages} pages")
+
+        with tempfile.TemporaryFile() as tmp:
+            stats = write_fleet_report(cable_list, tmp, progress=progress)
+            tmp.seek(0)
+            store.put(report_key, tmp.read())
+        st.session_state["report_stats"] = stats
+        bar.empty()
+
+    pdf = store.get(report_key)
+    if pdf is not None:
+        cols[1].download_button(
+            label="Download PDF Report",
+            data=pdf,
+            file_name="fleet_report.pdf",
+            mime="application/pdf",
+            key="dl_report",
+            on_click="ignore",
+        )
+        stats = st.session_state.get("report_stats")
+        if stats:
+            cols[2].caption(
+                f"{stats['pages']} pages in {stats['seconds']:.1f}s "
+                f"({stats['pages_per_second']:.2f} pages/s)"
+            )
+
+
+def render_cable_lookup():
+    """
+    Finds previously processed cables by serial number or lot prefix in the
+    serial index, without uploading their reports again, and offers an exact
+    match's output folder as a ZIP.
+    """
+    index = get_serial_index()
+    cols = st.columns([2, 1, 1, 3])
+    prefix = cols[0].text_input("Serial number or lot prefix", key="lookup_prefix").strip()
+    lookup_type = cols[1].selectbox("Type", ["All", "Tesla", "Paradise"], key="lookup_type")
+    limit = cols[2].number_input("Max results", min_value=10, max_value=10000, value=200, step=10, key="lookup_limit")
+    cols[3].caption(f"{len(index)} cables indexed")
+    if not prefix:
+        return
+
+    rows = index.search(prefix, cable_type=None if lookup_type == "All" else lookup_type, limit=int(limit))
+    if not rows:
+        st.info(f"No processed cable starts with '{prefix}'.")
+        return
+    st.dataframe(
+        pd.DataFrame(rows).rename(columns={
+            "serial": "Serial Number", "type": "Type", "length": "Length", "folder": "Folder", "updated": "Indexed",
+        }),
+        hide_index=True,
     )
-    
-    if not os.path.isdir(target_dir):
-        return None, f"Folder not found: {target_dir}"
 
-    # Check folder is not empty
-    has_files = any(
-        len(files) > 0 for _, _, files in os.walk(target_dir)
+    entry = index.lookup(prefix)
+    if entry is None:
+        return
+    cable = create_cable(entry["type"], entry["length"], entry["serial"])
+    # The ZIP is only built when the button is clicked
+    st.download_button(
+        label=f"Download ZIP for {entry['serial']}",
+        data=lambda: build_zip_for_cable(cable)[0] or b"",
+        file_name=f"{entry['serial']}_data.zip",
+        mime="application/zip",
+        key="dl_lookup_zip",
+        disabled=not entry["files"],
+        help=None if entry["files"] else "No measurement files indexed for this cable",
+        on_click="ignore",
     )
-    if not has_files:
-        return None, f"No files in {target_dir}"
-
-    # Build ZIP in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for root, _, files in os.walk(target_dir):
-            for fname in files:
-                abs_path = os.path.join(root, fname)
-                # Make paths inside the zip start at <serial_number>/...
-                rel_from_sn = os.path.relpath(abs_path, start=target_dir)
-                arcname = os.path.join(str(cable.serial_number), rel_from_sn)
-                zf.write(abs_path, arcname=arcname)
-
-    zip_buffer.seek(0)
-    zip_name = f"{cable.serial_number}_data.zip"
-    return zip_buffer, zip_name
-
-
-def create_cable(cable_type, cable_length, serial_number):
-    if cable_type == "Tesla":
-        return Tesla(cable_type, cable_length, serial_number)
-    elif cable_type == "Paradise":
-        return Paradise(cable_type, cable_length, serial_number)
-    else:
-        raise ValueError(f"Unknown cable type: {cable_type}")
 
 
 st.set_page_config(
@@ -235,139 +658,196 @@ st.set_page_config(
 st.title("PTL Cable Data Analysis")
 
 os.makedirs("temp", exist_ok=True)
+
+store = get_artifact_store()
+budget_mb = st.sidebar.number_input(
+    "Artifact memory budget (MB)",
+    min_value=16,
+    value=int(store.budget_bytes / (1024 * 1024)),
+    step=16,
+    help="Heatmap images, master CSVs and ZIPs are kept up to this size; the least recently used are dropped first.",
+)
+store.set_budget(budget_mb)
+st.sidebar.caption(
+    f"Artifacts: {len(store)} items, {store.nbytes / (1024 * 1024):.1f} MB · "
+    f"{store.hits} hits / {store.misses} misses / {store.evictions} evicted"
+)
+
 uploaded_files = st.file_uploader("Upload your CSV files", type="csv", accept_multiple_files=True)
 cables = {}
 
-pattern = re.compile(r"(?<![A-Za-z0-9])0[0-4][A-Za-z0-9]{8}(?![A-Za-z0-9])", re.IGNORECASE)
-
 if uploaded_files:
-    for uploaded_file in uploaded_files:
-        serial_number = "Unknown"
-            
-        target_text = uploaded_file.name
-
-        match = pattern.search(target_text)  # or uploaded_file.name
-        if match:
-            serial_number = match.group()
-            if len(serial_number) >= 2:
-                    first_two_digits = serial_number[:2]
-                    second_digit = first_two_digits[1]          
-                    if second_digit == "0":
-                        cable_type = "Paradise"
-                        cable_length = 11
-                    elif second_digit == "1":
-                        cable_type = "Paradise"
-                        cable_length = 15
-                    elif second_digit == "3":
-                        cable_type = "Tesla"
-                        cable_length = 11
-                    elif second_digit == "4":
-                        cable_type = "Tesla"
-                        cable_length = 15
-
-            
-            if serial_number in cables:
-                cable = cables[serial_number]
-            else:
-                cable = create_cable(cable_type, cable_length, serial_number)
-                cables[serial_number] = cable
-
-            process_csv(cable, uploaded_file)
+    job = get_ingest_job(uploaded_files)
+    drawn_version, cables = job.snapshot()
+    # The job version `cables` was taken at, for the incremental fleet statistics
+    st.session_state["cables_version"] = drawn_version
+    # Ticks while files are being parsed; stops once the job is idle
+    st.fragment(render_ingest_progress, run_every=INGEST_REFRESH_SECONDS if job.running else None)(
+        job, drawn_version, time.monotonic()
+    )
+    for name in job.skipped:
+        st.warning(f"Skipped {name}: no recognised serial number in the file name.")
+    for name, message in job.errors:
+        st.error(f"Could not process {name}: {message}")
     
     TESLA_ATTRS     = ["leakage", "leakage_1s", "resistance", "inv_resistance", "continuity", "inv_continuity"]
     PARADISE_ATTRS  = ["leakage", "leakage_1s", "resistance", "inv_resistance", "continuity", "inv_continuity"]
 
-    st.subheader("Master CSV Files")
-    
+    st.subheader("Master Files")
+    export_format = st.radio(
+        "Format",
+        export_formats(),
+        horizontal=True,
+        key="master_format",
+        help="Parquet needs pyarrow and Excel needs openpyxl; formats whose library is missing are not offered.",
+    )
+
     st.markdown("### Tesla")
-    render_group_of_six_buttons(cables, cable_type="Tesla", attr_names=TESLA_ATTRS, group_key="tesla")
+    render_group_of_six_buttons(
+        cables, cable_type="Tesla", attr_names=TESLA_ATTRS, group_key="tesla", export_format=export_format
+    )
 
     st.markdown("### Paradise")
-    render_group_of_six_buttons(cables, cable_type="Paradise", attr_names=PARADISE_ATTRS, group_key="paradise")
+    render_group_of_six_buttons(
+        cables, cable_type="Paradise", attr_names=PARADISE_ATTRS, group_key="paradise", export_format=export_format
+    )
+
+    st.divider()
+
+    st.subheader("Fleet Statistics")
+    stats_cols = st.columns(2)
+    with stats_cols[0]:
+        st.markdown("### Tesla")
+        render_fleet_stats(cables, cable_type="Tesla", attr_names=TESLA_ATTRS, group_key="tesla")
+    with stats_cols[1]:
+        st.markdown("### Paradise")
+        render_fleet_stats(cables, cable_type="Paradise", attr_names=PARADISE_ATTRS, group_key="paradise")
+
+    st.divider()
+
+    st.subheader("Anomaly Triage")
+    anomaly_scores = {}
+    anomaly_cols = st.columns(2)
+    with anomaly_cols[0]:
+        st.markdown("### Tesla")
+        anomaly_scores.update(render_anomaly_triage(cables, cable_type="Tesla", group_key="tesla"))
+    with anomaly_cols[1]:
+        st.markdown("### Paradise")
+        anomaly_scores.update(render_anomaly_triage(cables, cable_type="Paradise", group_key="paradise"))
+
+    st.divider()
+
+    st.subheader("Crosstalk")
+    render_crosstalk(cables)
+
+    st.divider()
+
+    st.subheader("Margins")
+    render_margins(cables, TESLA_ATTRS)
+
+    st.divider()
+
+    st.subheader("Data Quality")
+    render_coverage(cables)
 
     st.divider()
 
 
     
-    COL_LAYOUT = [1, 1, 1, 5, 5, 2]
     st.subheader("Processed Cables")
 
+    filter_cols = st.columns(4)
+    serial_query = filter_cols[0].text_input("Serial contains", key="filter_serial")
+    types = filter_cols[1].multiselect(
+        "Cable Type", sorted({c.type for c in cables.values()}), key="filter_type"
+    )
+    lengths = filter_cols[2].multiselect(
+        "Length (in)", sorted({c.length for c in cables.values()}), key="filter_length"
+    )
+    sort_by = filter_cols[3].selectbox("Sort by", SORT_OPTIONS, key="processed_sort")
+
+    view_cols = st.columns([2, 1, 1])
+    heatmap_tests = view_cols[0].multiselect(
+        "Heatmap tests",
+        list(Cable.MEASUREMENT_KINDS),
+        default=["leakage", "leakage_1s"],
+        format_func=lambda attr: Cable.kind(attr)[0],
+        key="heatmap_tests",
+    )
+    heatmap_mode = view_cols[1].radio(
+        "Heatmap",
+        list(Cable.HEATMAP_MODES),
+        horizontal=True,
+        key="heatmap_mode",
+        help="Margin shows measured / expected per channel (white = at the limit). "
+             "Run change shows the latest run minus the previous one. "
+             "Difference shows the test minus its paired test (1s - leakage, forward - inverted). "
+             "Vs fleet median shows each channel minus the median of all cables of the same type.",
+    )
+    heatmap_renderer = view_cols[2].radio(
+        "Renderer",
+        ["Interactive", "Server"],
+        horizontal=True,
+        key="heatmap_renderer",
+        help="Interactive heatmaps are drawn in the browser with per-channel tooltips; "
+             "Server renders matplotlib images.",
+    )
 
-    disabled_leakage = getattr(cable, "leakage", None) is None
-    disabled_1s = getattr(cable, "leakage_1s", None) is None
+    selected = select_cables(cables, serial_query, types, lengths, sort_by, anomaly_scores)
+    # Medians come from the incrementally maintained fleet statistics, only when that view is on
+    medians = fleet_medians(cables, heatmap_tests) if heatmap_mode == "Vs fleet median" else {}
+
+    render_cols = st.columns(max(1, len(heatmap_tests)))
+    for col, attr in zip(render_cols, heatmap_tests):
+        if col.button(
+            f"Render all {Cable.kind(attr)[0]} heatmaps",
+            key=f"render_all_{attr}",
+            disabled=heatmap_renderer != "Server" or not selected,
+            help="Renders the filtered cables in parallel worker processes (server renderer only).",
+        ):
+            render_all_heatmaps(selected, attr, heatmap_mode, medians)
+
+    # Only the visible page gets widgets
+    page_cols = st.columns([1, 1, 4])
+    page_size = page_cols[0].selectbox("Rows per page", [10, 25, 50, 100], key="page_size")
+    n_pages = max(1, -(-len(selected) // page_size))
+    if st.session_state.get("page", 1) > n_pages:
+        st.session_state["page"] = n_pages
+    page = page_cols[1].number_input("Page", min_value=1, max_value=n_pages, step=1, key="page")
+    page_cols[2].caption(
+        f"{len(selected)} of {len(cables)} cables · page {page} of {n_pages}"
+    )
 
-    header_cols = st.columns(COL_LAYOUT)
+    header_cols = st.columns(col_layout(len(heatmap_tests)))
     header_cols[0].markdown("**Serial Number**")
     header_cols[1].markdown("**Cable Type**")
     header_cols[2].markdown("**Length (in)**")
-    header_cols[3].markdown("**Leakage Heatmap**", disabled_leakage)
-    header_cols[4].markdown("**1s Leakage Heatmap**", disabled_1s)
-    header_cols[5].markdown("**Download CSVs**")
-
-    for cable in cables.values():
-        cols = st.columns(COL_LAYOUT)
-
-        cols[0].markdown(cable.serial_number)
-        cols[1].markdown(cable.type)
-        cols[2].markdown(cable.length)
-        
-        show_key_leak = f"show_leakage_{cable.serial_number}"
-        show_key_1s   = f"show_1s_{cable.serial_number}"
-        
-        has_leakage   = isinstance(getattr(cable, "leakage", None), pd.DataFrame) and not getattr(cable, "leakage").empty
-        has_leakage_1s = isinstance(getattr(cable, "leakage_1s", None), pd.DataFrame) and not getattr(cable, "leakage_1s").empty
-
-
-        if show_key_leak not in st.session_state:
-            st.session_state[show_key_leak] = False
-        if show_key_1s not in st.session_state:
-            st.session_state[show_key_1s] = False
-
-        if cols[3].button(
-            "Generate",
-            key=f"leakage_{cable.serial_number}",
-            disabled=not has_leakage or st.session_state[show_key_leak]
-        ):
-            st.session_state[show_key_leak] = True
-            
-        if cols[4].button(
-            "Generate",
-            key=f"leakage_1s_{cable.serial_number}",
-            disabled=not has_leakage_1s or st.session_state[show_key_1s]
-        ):
-            st.session_state[show_key_1s] = True
-        
-        if st.session_state[show_key_leak]:
-            fig_leak, ax_leak = cable.draw_heatmap("leakage")
-            cols[3].pyplot(fig_leak, use_container_width=True)
-
-
-        if st.session_state[show_key_1s]:
-            fig_1s, ax_1s = cable.draw_heatmap("1s")
-            cols[4].pyplot(fig_1s, use_container_width=True)
-
-        zip_buf, zip_name_or_err = build_zip_for_cable(
+    header_cols[3].markdown("**Anomaly Score**")
+    header_cols[4].markdown("**Leakage Preview**")
+    for col, attr in zip(header_cols[5:], heatmap_tests):
+        col.markdown(f"**{Cable.kind(attr)[0]} Heatmap**")
+    header_cols[-1].markdown("**Download CSVs**")
+
+    start = (page - 1) * page_size
+    page_cables = selected[start:start + page_size]
+    # One vectorized batch for the page's previews, cached on the cables
+    thumbnails = cable_thumbnails(page_cables)
+    for cable in page_cables:
+        render_cable_row(
             cable,
-            base_map={"Tesla": "teslaTemp", "Paradise": "paradiseTemp"},
-            temp_root="." 
+            anomaly_scores.get(cable.serial_number),
+            thumbnails[cable.serial_number],
+            heatmap_tests,
+            heatmap_mode,
+            heatmap_renderer,
+            medians,
         )
 
-        if zip_buf:
-            cols[5].download_button(
-                label="Download ZIP",
-                data=zip_buf,
-                file_name=zip_name_or_err,   # this is the zip_name
-                mime="application/zip",
-                key=f"download_{cable.serial_number}",
-            )
-
-        else:
-                # Show a disabled button with a tooltip-like note
-                cols[5].button(
-                    "Download ZIP",
-                    key=f"download_disabled_{cable.serial_number}",
-                    disabled=True,
-                    help=str(zip_name_or_err)  # this is the error message
-                )
-
+    st.divider()
+    st.subheader("Lot Report")
+    st.caption(f"Leakage and 1s heatmaps for the {len(selected)} cables matching the filters above.")
+    render_fleet_report(selected)
 
+st.divider()
+st.subheader("Cable Lookup")
+render_cable_lookup()
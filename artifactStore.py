@@ -0,0 +1,109 @@
+"""
+Bounded store for generated artifacts (heatmap PNGs, master CSVs, ZIPs).
+
+Artifacts are kept as encoded bytes in least-recently-used order and evicted
+once the total size passes the memory budget. Figures are encoded and closed
+straight away so pyplot's figure registry does not grow between reruns.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_BUDGET_MB = float(os.environ.get("ARTIFACT_BUDGET_MB", 256))
+
+
+def figure_to_png(fig, dpi: int = 100) -> bytes:
+    """Encode a matplotlib figure as PNG and close it."""
+    import matplotlib.pyplot as plt
+
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format="png", dpi=dpi)
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
+
+
+def digest(*parts) -> str:
+    """Short content hash of arrays, bytes or other values, for building cache keys."""
+    h = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, (bytes, bytearray)):
+            h.update(part)
+        else:
+            h.update(repr(part).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class ArtifactStore:
+    """Thread-safe LRU of bytes with a total size budget."""
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        """Cached bytes for `key` (marked as recently used), or None."""
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: bytes) -> bytes:
+        """Store `data` under `key`, evicting the oldest artifacts if over budget."""
+        data = bytes(data)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = data
+            self.nbytes += len(data)
+            self._evict()
+        return data
+
+    def get_or_create(self, key, factory) -> bytes:
+        """Cached bytes for `key`, calling `factory()` to produce them on a miss."""
+        data = self.get(key)
+        if data is None:
+            data = self.put(key, factory())
+        return data
+
+    def discard(self, key) -> None:
+        with self._lock:
+            data = self._items.pop(key, None)
+            if data is not None:
+                self.nbytes -= len(data)
+
+    def set_budget(self, budget_mb: float) -> None:
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def _evict(self) -> None:
+        # The newest item always stays, even if it alone exceeds the budget
+        while self.nbytes > self.budget_bytes and len(self._items) > 1:
+            _, data = self._items.popitem(last=False)
+            self.nbytes -= len(data)
+            self.evictions += 1
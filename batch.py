@@ -0,0 +1,145 @@
+"""
+Command-line batch processing of tester reports, without the Streamlit UI.
+
+    python batch.py report <report_dir> -o lot_report.pdf [--type Tesla]
+    python batch.py validate <report_dir> [-o coverage.csv]
+    python batch.py watch <report_dir> [--interval 1] [--settle 2] [--master-dir masterTables]
+                                [--archive-dir fleetArchive]
+    python batch.py find [serial_prefix] [--type Tesla] [--length 11] [--start S] [--end S] [--rebuild]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from uploadData import ingest_report
+from fleetReport import REPORT_MATRIX_TYPES, write_fleet_report
+from watchFolder import FolderWatcher
+from channelCoverage import channel_coverage, coverage_summary
+from serialIndex import get_serial_index
+
+
+def load_reports(report_dir, index=None) -> dict:
+    """Ingest every CSV under `report_dir` into {serial_number: Cable}, recording them in `index`."""
+    cables = {}
+    for path in sorted(Path(report_dir).rglob("*.csv")):
+        with open(path, "rb") as f:
+            if ingest_report(cables, path.name, f, index) is None:
+                print(f"Skipped {path}: no recognised serial number", file=sys.stderr)
+    return cables
+
+
+def cmd_report(args) -> int:
+    cables = load_reports(args.report_dir, get_serial_index(args.index))
+    selected = [c for c in cables.values() if args.type is None or c.type == args.type]
+    if not selected:
+        print("No cables found.", file=sys.stderr)
+        return 1
+
+    def progress(pages, done, total):
+        print(f"\r{done}/{total} cables, {pages} pages", end="", file=sys.stderr)
+
+    stats = write_fleet_report(selected, args.output, args.kinds, progress=progress)
+    print(file=sys.stderr)
+    print(
+        f"Wrote {stats['pages']} pages for {len(selected)} cables to {args.output} "
+        f"in {stats['seconds']:.1f}s ({stats['pages_per_second']:.2f} pages/s)"
+    )
+    return 0
+
+
+def cmd_validate(args) -> int:
+    cables = load_reports(args.report_dir, get_serial_index(args.index))
+    if not cables:
+        print("No cables found.", file=sys.stderr)
+        return 1
+    coverage = channel_coverage(cables)
+    print(coverage_summary(coverage).to_string(index=False))
+    if args.output:
+        coverage.to_csv(args.output, index=False)
+        print(f"Wrote per-cable coverage to {args.output}")
+    return 0 if coverage["Complete"].all() else 2
+
+
+def cmd_watch(args) -> int:
+    watcher = FolderWatcher(
+        args.report_dir, settle_seconds=args.settle, master_dir=args.master_dir, archive_dir=args.archive_dir,
+        index=get_serial_index(args.index),
+    )
+
+    def on_poll(summary):
+        if summary["ingested"] or summary["skipped"]:
+            print(
+                f"ingested {summary['ingested']} skipped {summary['skipped']} "
+                f"({summary['files_per_second']:.1f} files/s), "
+                f"{len(watcher.cables)} cables, "
+                f"masters: {', '.join(str(p) for p in summary['masters_written']) or '-'}",
+                flush=True,
+            )
+
+    print(f"Watching {args.report_dir} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        watcher.run(interval=args.interval, on_poll=on_poll)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_find(args) -> int:
+    index = get_serial_index(args.index)
+    if args.rebuild:
+        print(f"Indexed {index.rebuild(args.temp_root)} cables under {args.temp_root}", file=sys.stderr)
+    rows = index.search(args.prefix, args.type, args.length, args.start, args.end, limit=args.limit)
+    if not rows:
+        print("No indexed cables match.", file=sys.stderr)
+        return 1
+    for row in rows:
+        print(f"{row['serial']}\t{row['type']}\t{row['length']}\t{row['folder']}")
+    if len(rows) == args.limit:
+        print(f"(first {args.limit} shown; raise --limit for more)", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    # Every command that ingests or looks up cables uses the same index
+    index_arg = argparse.ArgumentParser(add_help=False)
+    index_arg.add_argument("--index", help="Serial index database (default cableIndex.sqlite or $CABLE_INDEX_PATH)")
+
+    report = sub.add_parser("report", parents=[index_arg], help="Write a multi-page PDF of heatmaps for every cable")
+    report.add_argument("report_dir", help="Folder of tester CSV reports (searched recursively)")
+    report.add_argument("-o", "--output", default="fleet_report.pdf")
+    report.add_argument("--type", choices=["Tesla", "Paradise"], help="Only include this cable type")
+    report.add_argument("--kinds", nargs="+", default=list(REPORT_MATRIX_TYPES), help="Matrix types per cable")
+    report.set_defaults(func=cmd_report)
+
+    validate = sub.add_parser("validate", parents=[index_arg], help="Report missing, duplicated and unmapped channels per cable")
+    validate.add_argument("report_dir", help="Folder of tester CSV reports (searched recursively)")
+    validate.add_argument("-o", "--output", help="Write the per-cable table to this CSV")
+    validate.set_defaults(func=cmd_validate)
+
+    watch = sub.add_parser("watch", parents=[index_arg], help="Ingest new or changed reports from a folder as they appear")
+    watch.add_argument("report_dir", help="Folder the testers write reports to")
+    watch.add_argument("--interval", type=float, default=1.0, help="Seconds between polls")
+    watch.add_argument("--settle", type=float, default=2.0, help="Seconds a file must stay unchanged before ingesting")
+    watch.add_argument("--master-dir", default="masterTables", help="Where master CSVs are written")
+    watch.add_argument("--archive-dir", help="Also append leakage vectors to the fleet archive in this folder")
+    watch.set_defaults(func=cmd_watch)
+
+    find = sub.add_parser("find", parents=[index_arg], help="Look up processed cables in the serial index by prefix or range")
+    find.add_argument("prefix", nargs="?", default="", help="Serial number or lot prefix, e.g. 0312")
+    find.add_argument("--type", choices=["Tesla", "Paradise"], help="Only cables of this type")
+    find.add_argument("--length", type=int, help="Only cables of this length")
+    find.add_argument("--start", help="Lowest serial number (inclusive)")
+    find.add_argument("--end", help="Highest serial number (inclusive)")
+    find.add_argument("--limit", type=int, default=1000)
+    find.add_argument("--rebuild", action="store_true", help="First index every cable folder already on disk")
+    find.add_argument("--temp-root", default=".", help="Folder holding teslaTemp / paradiseTemp, for --rebuild")
+    find.set_defaults(func=cmd_find)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Headless load and latency harness for app.py.
+
+Drives the Streamlit script with streamlit.testing's AppTest, feeding it N
+synthetic report files through a stubbed `st.file_uploader`, and walks a
+typical session: first load, reruns until the first cable is on the page and
+until every file is processed (at the app's page refresh interval), idle
+rerun, switch the master export format and click a master download (which
+builds the table), switch on a row's heatmap, and check the per-row ZIP
+downloads are ready. Each step records its wall time and the
+process RSS afterwards. Every N runs in a fresh interpreter, so memory
+figures are not carried over.
+
+    python benchmarks/bench_app_session.py [N ...]      (default: 10 100 1000)
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+ROOT = synthetic.ROOT
+
+# app.INGEST_PAGE_REFRESH_SECONDS: how often the page redraws while files are processed
+PAGE_REFRESH_SECONDS = 5.0
+
+# Script AppTest runs: serves the synthetic reports to the uploader, then runs app.py
+WRAPPER = """
+import glob, io, os, runpy
+import streamlit as st
+
+class UploadedReport(io.BytesIO):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+REPORTS = sorted(glob.glob(os.path.join(os.environ["BENCH_REPORT_DIR"], "*.csv")))
+st.file_uploader = lambda *args, **kwargs: [UploadedReport(p) for p in REPORTS]
+runpy.run_path(os.path.join(os.environ["BENCH_APP_ROOT"], "app.py"), run_name="__main__")
+"""
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def record_deferred_downloads() -> dict:
+    """
+    {deferred file id: data callable} of every deferred download button drawn
+    from now on. AppTest drops its media manager after each run, so a click
+    is reproduced by calling the callable, as the server would.
+    """
+    from streamlit.runtime.media_file_manager import MediaFileManager
+
+    callables = {}
+    add_deferred = MediaFileManager.add_deferred
+
+    def recording_add_deferred(self, data_callable, *args, **kwargs):
+        file_id = add_deferred(self, data_callable, *args, **kwargs)
+        callables[file_id] = data_callable
+        return file_id
+
+    MediaFileManager.add_deferred = recording_add_deferred
+    return callables
+
+
+def session(n_reports: int) -> list:
+    """Run one session in this process; returns [{step, seconds, rss_mb, ...}]."""
+    from streamlit.testing.v1 import AppTest
+
+    deferred = record_deferred_downloads()
+
+    work = tempfile.mkdtemp(prefix="app_session_")
+    report_dir = os.path.join(work, "reports")
+    # Two reports (leakage and 1s leakage) per cable
+    synthetic.write_reports(report_dir, max(1, n_reports // 2), tests=("leakage", "leakage_1s"))
+    wrapper = os.path.join(work, "wrapper.py")
+    with open(wrapper, "w") as f:
+        f.write(WRAPPER)
+    os.environ.update(BENCH_REPORT_DIR=report_dir, BENCH_APP_ROOT=ROOT)
+    os.chdir(work)  # per-cable folders are written relative to the working directory
+
+    at = AppTest.from_file(wrapper, default_timeout=3600)
+    results = []
+
+    def wait_for(name, ready, tick=0.2):
+        # `ready` is checked before each run, so the run that follows draws it
+        start = time.perf_counter()
+        runs = 0
+        while True:
+            done = ready()
+            at.run()
+            runs += 1
+            if at.exception:
+                raise RuntimeError(f"{name}: {at.exception[0].message}")
+            if done:
+                break
+            time.sleep(tick)
+        results.append({
+            "n": n_reports, "step": f"{name} ({runs} runs)",
+            "seconds": time.perf_counter() - start, "rss_mb": rss_mb(),
+        })
+
+    def step(name, action=None):
+        if action is not None:
+            action()
+        start = time.perf_counter()
+        at.run()
+        seconds = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+        results.append({
+            "n": n_reports, "step": name, "seconds": seconds, "rss_mb": rss_mb(),
+        })
+
+    step("first load")
+    job = at.session_state["ingest_job"]
+    wait_for("first cable shown", lambda: len(job.snapshot()[1]) > 0)
+    wait_for("all files processed", lambda: not job.running, tick=PAGE_REFRESH_SECONDS)
+    def download(name, key):
+        button = next(e for e in at.get("download_button") if e.proto.id.endswith(key))
+        start = time.perf_counter()
+        data = deferred[button.proto.deferred_file_id]()
+        results.append({
+            "n": n_reports, "step": name, "seconds": time.perf_counter() - start,
+            "rss_mb": rss_mb(), "download_mb": len(data) / 2**20,
+        })
+
+    step("idle rerun")
+    step("switch master format", lambda: at.radio(key="master_format").set_value("Parquet"))
+    download("download master (Parquet)", "dl_tesla_leakage")
+    first_serial = synthetic.serial_for("Tesla", 0)
+    step("show heatmap row", lambda: at.button(key=f"leakage_{first_serial}").click())
+    step("idle rerun (heatmap shown)")
+
+    # Per-row ZIPs are built during the row's render; count the ready buttons
+    zips = [e for e in at.get("download_button") if e.proto.label == "Download ZIP"]
+    results[-1]["zip_downloads"] = len(zips)
+    return results
+
+
+def main(sizes):
+    rows = []
+    for n in sizes:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--session", str(n)],
+            capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            print(out.stderr[-2000:], file=sys.stderr)
+            raise SystemExit(f"session with N={n} failed")
+        rows.extend(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'N':>6}  {'step':<34} {'seconds':>9} {'RSS MiB':>9}")
+    for row in rows:
+        extra = f"   ZIP downloads: {row['zip_downloads']}" if "zip_downloads" in row else ""
+        if "download_mb" in row:
+            extra = f"   {row['download_mb']:.1f} MiB"
+        print(f"{row['n']:>6}  {row['step']:<34} {row['seconds']:>9.2f} {row['rss_mb']:>9.0f}{extra}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--session":
+        print(json.dumps(session(int(sys.argv[2]))))
+    else:
+        main([int(a) for a in sys.argv[1:]] or [10, 100, 1000])
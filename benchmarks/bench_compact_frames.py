@@ -0,0 +1,69 @@
+"""
+Per-cable memory and master-table build time with object-string channels and
+float64 measurements, against categorical channels with float64 and float32.
+
+    python benchmarks/bench_compact_frames.py [cables]
+"""
+import sys
+import time
+
+import synthetic
+
+from Cable import Cable
+from masterData import build_master_dataframe
+
+ATTRS = ("leakage", "leakage_1s", "resistance")
+
+
+def bytes_per_cable(cables) -> float:
+    """Deep size per cable; categories shared between cables are counted once."""
+    total, seen = 0, set()
+    for cable in cables.values():
+        for attr in ATTRS:
+            df = getattr(cable, attr)
+            for col in df.columns:
+                series = df[col]
+                if hasattr(series, "cat"):
+                    total += series.cat.codes.nbytes
+                    categories = series.cat.categories
+                    if id(categories) not in seen:
+                        seen.add(id(categories))
+                        total += categories.memory_usage(deep=True)
+                else:
+                    total += series.memory_usage(index=False, deep=True)
+            total += df.index.memory_usage(deep=True)
+    return total / len(cables)
+
+
+def time_it(fn, repeat=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ordered_vectors(cables):
+    for cable in cables.values():
+        cable._ordered_cache.clear()
+        cable.ordered_vector("leakage")
+
+
+def run(label, cables):
+    master = time_it(lambda: build_master_dataframe(cables, "Tesla", "leakage"))
+    vectors = time_it(lambda: ordered_vectors(cables))
+    print(f"{label:<24} {bytes_per_cable(cables) / 1024:8.1f} KiB/cable   "
+          f"master {master * 1000:8.1f} ms   ordered vectors {vectors * 1000:8.1f} ms")
+
+
+def main(n=1000):
+    run("object + float64", synthetic.make_fleet(n, compact=False))
+    Cable.measurement_dtype = "float64"
+    run("categorical + float64", synthetic.make_fleet(n))
+    Cable.measurement_dtype = "float32"
+    run("categorical + float32", synthetic.make_fleet(n))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
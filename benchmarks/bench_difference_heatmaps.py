@@ -0,0 +1,55 @@
+"""
+Time to compute difference heatmap values for a fleet: 1s leakage - leakage
+and leakage - fleet median, from the cached ordered vectors and the FleetStats
+median, against merging each cable's two DataFrames on Channel and reindexing
+to the channel order (the by-hand CSV diff).
+
+    python benchmarks/bench_difference_heatmaps.py [cables]
+"""
+import sys
+import time
+
+import numpy as np
+
+import synthetic
+
+from fleetStats import FleetStats, fleet_matrix
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def merged_difference(cable):
+    merged = cable.leakage.merge(cable.leakage_1s, on="Channel", suffixes=("", "_1s"))
+    measured = merged.columns[1]
+    diff = (merged[f"{measured}_1s"] - merged[measured]).to_numpy(dtype=float)
+    return merged.assign(Diff=diff).set_index("Channel")["Diff"].reindex(cable.order).to_numpy(dtype=float)
+
+
+def main(n_cables: int = 1000):
+    cables = synthetic.make_fleet(n_cables)
+    tesla = [c for c in cables.values() if c.type == "Tesla"]
+    for cable in cables.values():
+        cable.ordered_vector("leakage")  # ordered vectors are cached as in the app
+        cable.ordered_vector("1s")
+
+    timed(f"{n_cables} merged DataFrame diffs", lambda: [merged_difference(c) for c in cables.values()])
+    diffs = timed(f"{n_cables} difference_vector", lambda: [c.difference_vector("1s") for c in cables.values()])
+
+    serials, matrix, channels = fleet_matrix(cables, "Tesla", "leakage")
+    stats = FleetStats(channels)
+    timed(f"FleetStats over {len(serials)} Tesla cables", lambda: stats.update_many(serials, matrix))
+    median = timed("fleet median (histogram percentile)", stats.median)
+    timed(f"{len(tesla)} fleet_deviation", lambda: [c.fleet_deviation("leakage", median) for c in tesla])
+
+    check = merged_difference(tesla[0])
+    same = np.allclose(np.nan_to_num(check), np.nan_to_num(tesla[0].difference_vector("1s")))
+    print(f"difference matches merged diff: {same}; vector shape {diffs[0].shape}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,56 @@
+"""
+Per-render cost of a heatmap PNG: a fresh figure per cable (draw_mode_values,
+as before) against the shared figure template (mode_png). Both paths produce
+the same pixels; the first run checks that.
+
+    python benchmarks/bench_figure_template.py [renders]
+"""
+import io
+import sys
+import time
+
+import numpy as np
+
+import synthetic
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.image as mpimg
+
+from artifactStore import figure_to_png
+
+
+def fresh_png(cable, values):
+    return figure_to_png(cable.draw_mode_values(values)[0])
+
+
+def template_png(cable, values):
+    return cable.mode_png(values)
+
+
+def bench(name, render, cables):
+    start = time.perf_counter()
+    for cable in cables:
+        render(cable, cable.ordered_vector("leakage"))
+    per = (time.perf_counter() - start) / len(cables)
+    print(f"{name:<22} {per * 1000:8.1f} ms/render")
+    return per
+
+
+def main(n=20):
+    for cable_type in ("Tesla", "Paradise"):
+        cables = list(synthetic.make_fleet(n, cable_type).values())
+        first = cables[0]
+        values = first.ordered_vector("leakage")
+        same = np.array_equal(
+            mpimg.imread(io.BytesIO(fresh_png(first, values))),
+            mpimg.imread(io.BytesIO(template_png(first, values))),
+        )
+        print(f"{cable_type}: identical pixels: {same}")
+        fresh = bench("  new figure", fresh_png, cables)
+        reused = bench("  figure template", template_png, cables)
+        print(f"  speed-up {fresh / reused:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
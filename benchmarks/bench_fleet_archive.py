@@ -0,0 +1,63 @@
+"""
+Fleet archive at history scale: append N synthetic Tesla cables in batches,
+then time zero-copy slicing, chunked statistics and a single-cable heatmap,
+reporting peak RSS against the size of the matrix on disk.
+
+    python benchmarks/bench_fleet_archive.py [cables] [archive dir]
+"""
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts the repository root on sys.path)
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from fleetArchive import FleetArchive
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:10.1f} ms   peak RSS {peak_rss_mb():7.0f} MiB")
+    return result
+
+
+def main(n=100_000, root=None):
+    root = root or tempfile.mkdtemp(prefix="fleet_archive_")
+    archive = FleetArchive(root, "Tesla", "leakage")
+    rng = np.random.default_rng(0)
+    n_ch = len(archive.channels)
+    batch = 5000
+
+    def fill():
+        for start in range(0, n, batch):
+            rows = min(batch, n - start)
+            serials = [synthetic.serial_for("Tesla", i) for i in range(start, start + rows)]
+            archive.append(serials, rng.exponential(100.0, size=(rows, n_ch)))
+
+    timed(f"append {n} cables", fill)
+    print(f"on disk: {len(archive)} × {n_ch} float32 = {archive.values.nbytes / 2**20:.0f} MiB in {archive.path}")
+
+    reopened = timed("reopen", lambda: FleetArchive(root, "Tesla", "leakage"))
+    view = timed("channel slice", lambda: reopened.channel_slice(0, 15))
+    print(f"  shares memory with the map: {np.shares_memory(view, reopened._mm)}")
+    timed("cable range slice", lambda: reopened.rows(n // 2, n // 2 + 1000))
+    frame = timed("chunked stats", reopened.stats_frame)
+    print(frame.head(3).to_string(index=False))
+    fig, _ = timed("heatmap of one cable", lambda: reopened.draw_heatmap(reopened.serials[-1]))
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    main(n, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,53 @@
+"""
+Server CPU per heatmap view: matplotlib PNG (what st.pyplot ships) versus the
+JSON spec rendered in the browser.
+
+    python benchmarks/bench_heatmap_render.py [views]
+"""
+import io
+import json
+import sys
+import time
+
+import synthetic
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from clientHeatmap import to_vega_lite
+
+
+def png_view(cable):
+    fig, _ = cable.draw_heatmap("leakage")
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+
+def json_view(cable):
+    return len(json.dumps(to_vega_lite(cable.heatmap_spec("leakage")), separators=(",", ":")))
+
+
+def bench(name, view, cables):
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    sizes = [view(cable) for cable in cables]
+    cpu = (time.process_time() - start_cpu) / len(cables)
+    wall = (time.perf_counter() - start_wall) / len(cables)
+    print(f"{name:<16} cpu/view {cpu * 1000:8.1f} ms   wall/view {wall * 1000:8.1f} ms   "
+          f"payload {sum(sizes) / len(sizes) / 1024:7.1f} KiB")
+    return cpu
+
+
+def main(views=10):
+    for cable_type in ("Tesla", "Paradise"):
+        cables = list(synthetic.make_fleet(views, cable_type).values())
+        print(f"{cable_type} ({views} views)")
+        png = bench("server PNG", png_view, cables)
+        spec = bench("client JSON", json_view, cables)
+        print(f"{'speedup':<16} {png / max(spec, 1e-9):8.1f}x\n")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
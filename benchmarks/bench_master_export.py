@@ -0,0 +1,62 @@
+"""
+Peak memory and time of a master-table export: the whole table as one CSV
+string (as the app used to do), against `export_master` writing row chunks
+of each available format to a file. Peak memory is traced on top of the
+built master DataFrame, which both paths share; times are from untraced runs.
+
+    python benchmarks/bench_master_export.py [cables]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import synthetic
+
+from masterData import build_master_dataframe, export_formats, export_master
+
+
+def measure(fn):
+    """(seconds, peak traced MiB, output MiB) of `fn`, which returns its output size."""
+    start = time.perf_counter()
+    size = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, size / 2**20
+
+
+def whole_csv(master, path):
+    buf = io.StringIO()
+    master.to_csv(buf, index=False)
+    data = buf.getvalue().encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def chunked(master, path, fmt):
+    export_master(master, path, fmt)
+    return os.path.getsize(path)
+
+
+def main(n_cables: int = 5000):
+    cables = synthetic.make_fleet(n_cables)
+    master, _ = build_master_dataframe(cables, "Tesla", "leakage")
+    print(f"master table: {master.shape[0]} rows x {master.shape[1] - 1} cables, "
+          f"{master.memory_usage(deep=True).sum() / 2**20:.1f} MiB in memory")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "master")
+        rows = [("whole CSV string", measure(lambda: whole_csv(master, path)))]
+        rows += [(f"chunked {fmt}", measure(lambda: chunked(master, path, fmt))) for fmt in export_formats()]
+    for name, (seconds, peak, size) in rows:
+        print(f"{name:<20} {seconds:7.2f} s  peak {peak:8.1f} MiB  output {size:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
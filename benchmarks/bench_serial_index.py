@@ -0,0 +1,99 @@
+"""
+Serial index lookups against walking the output folders: index `cables`
+synthetic entries in one transaction, then time point lookups, lot-prefix and
+range searches. For scale, a smaller teslaTemp / paradiseTemp tree of `tree`
+cables is written to disk and searched with os.walk, as finding a cable's
+folder used to require, and `rebuild` times one pass over that tree.
+
+    python benchmarks/bench_serial_index.py [cables] [tree]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the repository root on sys.path)
+
+from serialIndex import DEFAULT_BASE_MAP, SerialIndex
+
+LENGTHS = (11, 13, 15)
+
+
+def serial_for(i: int) -> str:
+    """Ten-digit serial number in lot "0<k>", k = 0..4, as the app's serial regex expects."""
+    return f"0{i % 5}{i:08d}"
+
+
+def entries(n_cables: int, root: str):
+    for i in range(n_cables):
+        serial = serial_for(i)
+        cable_type = "Tesla" if i % 5 >= 3 else "Paradise"
+        length = LENGTHS[i % len(LENGTHS)]
+        folder = os.path.join(root, DEFAULT_BASE_MAP[cable_type], str(length), serial)
+        files = {
+            "leakage": os.path.join(folder, f"leakage_{length}_{serial}.csv"),
+            "leakage_1s": os.path.join(folder, f"1sleakage_{length}_{serial}.csv"),
+        }
+        yield serial, cable_type, length, folder, files
+
+
+def write_tree(n_cables: int, root: str):
+    for _, _, _, folder, files in entries(n_cables, root):
+        os.makedirs(folder)
+        for path in files.values():
+            open(path, "w").close()
+
+
+def walk_find(root: str, serial: str):
+    """Folder of `serial` found by walking every output tree."""
+    for base in DEFAULT_BASE_MAP.values():
+        for dirpath, dirnames, _ in os.walk(os.path.join(root, base)):
+            if serial in dirnames:
+                return os.path.join(dirpath, serial)
+    return None
+
+
+def timed(label, fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"{label:<44} {per_call * 1000:10.3f} ms")
+    return result
+
+
+def main(n_cables: int = 100_000, n_tree: int = 5000):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SerialIndex(os.path.join(tmp, "cableIndex.sqlite"))
+        timed(f"index {n_cables} cables (one transaction)", lambda: index.add_cables(entries(n_cables, tmp)))
+        print(f"index file: {os.path.getsize(index.path) / 2**20:.1f} MiB")
+
+        probes = [serial_for(rng.randrange(n_cables)) for _ in range(1000)]
+        it = iter(probes)
+        timed("point lookup (folder + files)", lambda: index.lookup(next(it)), repeat=len(probes))
+        lot = timed("lot prefix '03', first 1000", lambda: index.search("03"), repeat=20)
+        print(f"  {len(lot)} rows, first {lot[0]['serial']}")
+        narrow = timed("prefix '0300001', Tesla, length 13", lambda: index.search("0300001", "Tesla", 13), repeat=20)
+        print(f"  {len(narrow)} rows")
+        span = timed(
+            "range of 500 serials",
+            lambda: index.search(start=serial_for(50_000), end=serial_for(52_495)),
+            repeat=20,
+        )
+        print(f"  {len(span)} rows")
+        index.close()
+
+        tree = os.path.join(tmp, "tree")
+        write_tree(n_tree, tree)
+        missing = serial_for(n_tree + 1)
+        timed(f"os.walk find in {n_tree}-cable tree (miss)", lambda: walk_find(tree, missing), repeat=5)
+        rebuilt = SerialIndex(os.path.join(tmp, "rebuilt.sqlite"))
+        count = timed(f"rebuild index from {n_tree}-cable tree", lambda: rebuilt.rebuild(tree))
+        print(f"  {count} cables, {sum(len(rebuilt.lookup(serial_for(i))['files']) for i in range(100))} files in first 100")
+        rebuilt.close()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
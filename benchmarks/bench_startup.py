@@ -0,0 +1,84 @@
+"""
+Cold-start cost of the app: module import time, time to first paint of an
+empty app.py session, and the one-off cost of the first heatmap draw (where
+matplotlib / seaborn are now loaded). Each measurement runs in a fresh
+interpreter; the median of `repeats` runs is reported.
+
+    python benchmarks/bench_startup.py [repeats]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import synthetic
+
+ROOT = synthetic.ROOT
+
+# Everything app.py imports from this repository
+APP_MODULES = [
+    "Cable", "uploadData", "Tesla", "Paradise", "fleetStats", "crosstalk", "clientHeatmap",
+    "margins", "anomaly", "artifactStore", "renderService", "fleetReport", "masterData",
+]
+
+IMPORT_SNIPPET = f"""
+import sys, time
+start = time.perf_counter()
+import streamlit, pandas, numpy
+base = time.perf_counter()
+{"; ".join(f"import {m}" for m in APP_MODULES)}
+end = time.perf_counter()
+plotting = [m for m in ("matplotlib", "seaborn") if m in sys.modules]
+print(end - start, end - base, ",".join(plotting) or "-")
+"""
+
+FIRST_PAINT_SNIPPET = f"""
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({os.path.join(ROOT, "app.py")!r}, default_timeout=300).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+FIRST_DRAW_SNIPPET = """
+import time
+import numpy as np
+from Tesla import Tesla
+cable = Tesla("Tesla", 11, "0300000000")
+start = time.perf_counter()
+fig, _ = cable.draw_leakage_values(np.zeros(len(Tesla.order)))
+first = time.perf_counter() - start
+start = time.perf_counter()
+fig, _ = cable.draw_leakage_values(np.zeros(len(Tesla.order)))
+print(first, time.perf_counter() - start)
+"""
+
+
+def run(snippet: str, cwd: str) -> list:
+    env = dict(os.environ, PYTHONPATH=ROOT, MPLBACKEND="Agg")
+    out = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+    return out.stdout.split()
+
+
+def main(repeats: int = 5):
+    with tempfile.TemporaryDirectory() as cwd:
+        imports = [run(IMPORT_SNIPPET, cwd) for _ in range(repeats)]
+        total = statistics.median(float(r[0]) for r in imports)
+        own = statistics.median(float(r[1]) for r in imports)
+        print(f"import (incl. streamlit/pandas) {total * 1000:8.1f} ms")
+        print(f"import (repo modules only)      {own * 1000:8.1f} ms   plotting loaded: {imports[0][2]}")
+
+        paint = statistics.median(float(run(FIRST_PAINT_SNIPPET, cwd)[0]) for _ in range(repeats))
+        print(f"first paint (empty session)     {paint * 1000:8.1f} ms")
+
+        draws = [run(FIRST_DRAW_SNIPPET, cwd) for _ in range(repeats)]
+        print(f"first heatmap draw              {statistics.median(float(d[0]) for d in draws) * 1000:8.1f} ms")
+        print(f"later heatmap draws             {statistics.median(float(d[1]) for d in draws) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
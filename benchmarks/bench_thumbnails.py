@@ -0,0 +1,41 @@
+"""
+Time to build leakage thumbnails for a page of cables: one vectorized batch
+through the colour lookup table (cold, then from the per-cable cache), against
+a single full matplotlib heatmap for scale.
+
+    python benchmarks/bench_thumbnails.py [cables]
+"""
+import sys
+import time
+
+import numpy as np
+
+import synthetic
+
+from artifactStore import figure_to_png
+from thumbnails import cable_thumbnails
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<36} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(n_cables: int = 1000):
+    cables = synthetic.make_fleet(n_cables)
+    for cable in cables.values():
+        cable.ordered_vector("leakage")  # ordered vectors are cached as in the app
+
+    thumbs = timed(f"{n_cables} thumbnails (cold)", lambda: cable_thumbnails(cables.values()))
+    timed(f"{n_cables} thumbnails (cached)", lambda: cable_thumbnails(cables.values()))
+    shape = next(iter(thumbs.values())).shape
+    print(f"thumbnail: {shape[1]}x{shape[0]} px, {np.prod(shape)} bytes")
+
+    cable = next(iter(cables.values()))
+    timed("1 full heatmap PNG (matplotlib)", lambda: figure_to_png(cable.draw_heatmap("leakage")[0]))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,83 @@
+"""
+Local load test for the HTTP API (api.py).
+
+Starts the server on a free port, uploads synthetic reports, then hits the
+heatmap and master-table endpoints from concurrent clients and reports
+throughput and latency per endpoint. Run from a scratch directory: report
+processing writes per-cable CSVs into the working directory.
+
+    python benchmarks/load_api.py [cables] [clients] [requests per client]
+"""
+import random
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import synthetic
+
+from api import CableService, make_server
+from renderService import get_render_service
+
+
+def request(base, method, path, body=None):
+    req = urllib.request.Request(base + path, data=body, method=method)
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as resp:
+        payload = resp.read()
+    return time.perf_counter() - start, len(payload)
+
+
+def summarize(name, latencies, wall):
+    lat = np.sort(np.asarray(latencies)) * 1000
+    print(f"{name:<14} {len(lat):6d} req  {len(lat) / wall:8.1f} req/s  "
+          f"p50 {np.percentile(lat, 50):8.1f} ms  p95 {np.percentile(lat, 95):8.1f} ms")
+
+
+def run_phase(name, base, paths, clients, method="GET", bodies=None):
+    bodies = bodies or [None] * len(paths)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda pb: request(base, method, *pb), zip(paths, bodies)))
+    summarize(name, [r[0] for r in results], time.perf_counter() - start)
+
+
+def main(n_cables=50, clients=8, per_client=50):
+    server = make_server(port=0, service=CableService())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rng = np.random.default_rng(0)
+    serials = [synthetic.serial_for("Tesla", i) for i in range(n_cables)]
+    uploads = [
+        (f"/reports?name={urllib.request.quote(synthetic.report_name(s, test))}",
+         synthetic.report_text("Tesla", test, rng).encode())
+        for s in serials for test in ("leakage", "leakage_1s")
+    ]
+    run_phase("upload", base, [u[0] for u in uploads], clients, "POST", [u[1] for u in uploads])
+
+    total = clients * per_client
+    pick = random.Random(0)
+    json_paths = [f"/cables/{pick.choice(serials)}/heatmap/leakage.json" for _ in range(total)]
+    run_phase("heatmap json", base, json_paths, clients)
+
+    # First pass renders in the worker pool, second pass is served from cache
+    png_paths = [f"/cables/{s}/heatmap/leakage.png" for s in serials]
+    run_phase("png cold", base, png_paths, clients)
+    run_phase("png cached", base, [pick.choice(png_paths) for _ in range(total)], clients)
+
+    master_paths = ["/master/Tesla/leakage.csv"] * total
+    run_phase("master csv", base, master_paths, clients)
+
+    server.shutdown()
+    get_render_service().shutdown()
+    store = server.RequestHandlerClass.service.store
+    print(f"cache: {len(store)} items, {store.nbytes / 1024:.0f} KiB, {store.hits} hits, {store.misses} misses")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
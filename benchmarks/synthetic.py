@@ -0,0 +1,106 @@
+"""
+Synthetic cables for the benchmarks, shaped like the output of `process_csv`.
+Importing this module also puts the repository root on sys.path.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from Tesla import Tesla
+from Paradise import Paradise
+
+CLASSES = {"Tesla": Tesla, "Paradise": Paradise}
+# Second serial digit encodes type and length (see app.py)
+PREFIXES = {"Tesla": "03", "Paradise": "00"}
+
+
+def serial_for(cable_type: str, index: int) -> str:
+    return f"{PREFIXES[cable_type]}{index:08X}"
+
+
+def make_cable(cable_type: str, index: int, rng: np.random.Generator, compact: bool = True):
+    """
+    One cable with leakage, 1s leakage and resistance data on every channel.
+    `compact` applies `Cable.compact_frame` as `process_csv` does.
+    """
+    cls = CLASSES[cable_type]
+    cable = cls(cable_type, 11, serial_for(cable_type, index))
+    n = len(cls.order)
+    channels = list(cls.order)
+
+    cable.leakage = pd.DataFrame({
+        "Channel": channels,
+        "Measured_pA": rng.exponential(100.0, n),
+        "Expected_pA": np.full(n, 500.0),
+    })
+    cable.leakage_1s = pd.DataFrame({
+        "Channel": channels,
+        "Measured_pA": rng.exponential(80.0, n),
+        "Expected_pA": np.full(n, 500.0),
+    })
+    cable.resistance = pd.DataFrame({
+        "Channel": channels,
+        "Measured_R (mOhm)": rng.uniform(100.0, 900.0, n),
+        "Expected_R (mOhm)": np.full(n, 1000.0),
+    })
+    if compact:
+        for attr in ("leakage", "leakage_1s", "resistance"):
+            setattr(cable, attr, cable.compact_frame(getattr(cable, attr)))
+    return cable
+
+
+def make_fleet(n: int, cable_type: str = "Tesla", seed: int = 0, compact: bool = True) -> dict:
+    rng = np.random.default_rng(seed)
+    cables = (make_cable(cable_type, i, rng, compact) for i in range(n))
+    return {cable.serial_number: cable for cable in cables}
+
+
+# Test names as they appear in tester report headers (see uploadData.is_*)
+REPORT_TESTS = {
+    "leakage": "11989-0312-Leakage Rev A",
+    "leakage_1s": "11989-0312-Leakage 1s Rev A",
+    "resistance": "11989-0312-Resistance Rev A",
+    "inv_resistance": "11989-0312-Resistance Inverted Rev A",
+    "continuity": "11989-0312-Continuity-Test-RevC",
+    "inv_continuity": "11989-0312-Continuity-Test-Inv-RevC",
+}
+
+
+def report_text(cable_type: str, test: str, rng: np.random.Generator) -> str:
+    """A tester report CSV for one test, with a row for every channel."""
+    lines = [
+        f"Test Name: {REPORT_TESTS[test]}",
+        "Operator: benchmark",
+        "Instruction Type,From Points,To Points,Value Measured,Value Expected",
+    ]
+    for ch in CLASSES[cable_type].order:
+        if test in ("leakage", "leakage_1s"):
+            lines.append(f"CUSTOM,J1-{ch} ({ch}),GND,{rng.exponential(100.0):.2f} pA,500 pA")
+        else:
+            lines.append(f"4WIRE,J1-{ch} ({ch}),J2-{ch},{rng.uniform(100.0, 900.0):.1f} mOhm,1000 mOhm")
+    return "\n".join(lines) + "\n"
+
+
+def report_name(serial: str, test: str) -> str:
+    return f"{REPORT_TESTS[test]}_TestReport_{serial}.csv"
+
+
+def write_reports(directory, n: int, cable_type: str = "Tesla", tests=("leakage", "leakage_1s"), seed: int = 0) -> list:
+    """Write report files for `n` cables into `directory`; returns the paths."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(n):
+        serial = serial_for(cable_type, i)
+        for test in tests:
+            path = os.path.join(directory, report_name(serial, test))
+            with open(path, "w") as f:
+                f.write(report_text(cable_type, test, rng))
+            paths.append(path)
+    return paths
@@ -0,0 +1,112 @@
+"""
+Channel coverage and data quality of every cable against its class `order`.
+
+`create_matrix` and `ordered_vector` fill missing channels and keep only the
+first row of a duplicated channel, and report rows whose channel could not be
+parsed or is not in `order` (e.g. Tesla "0") are dropped on ingest. This
+module counts all three per cable and test in one pass per (cable type, test):
+every cable's channel codes are concatenated and binned with a single bincount.
+
+    missing     channels in `order` with no row
+    duplicated  channels in `order` with more than one row
+    unmapped    rows whose channel is not in `order`, including rows
+                dropped on ingest (`df.attrs["unmapped_rows"]`)
+"""
+import numpy as np
+import pandas as pd
+
+MEASUREMENT_ATTRS = ["leakage", "leakage_1s", "resistance", "inv_resistance", "continuity", "inv_continuity"]
+
+# How many missing / duplicated channel names are listed per row
+MAX_LISTED = 8
+
+
+def _channel_codes(cable, df: pd.DataFrame) -> np.ndarray:
+    """Position of each row's channel in `cable.order`, -1 if not in it."""
+    channel = df["Channel"]
+    dtype = cable.channel_dtype()
+    if isinstance(channel.dtype, pd.CategoricalDtype) and channel.cat.categories.equals(dtype.categories):
+        return channel.cat.codes.to_numpy()
+    # Extra categories or plain strings: recode against the class order
+    return pd.Categorical(channel.astype(str), dtype=dtype).codes
+
+
+def _listed(channels: np.ndarray, flags: np.ndarray) -> str:
+    names = channels[flags]
+    text = ", ".join(names[:MAX_LISTED])
+    if len(names) > MAX_LISTED:
+        text += f", … (+{len(names) - MAX_LISTED})"
+    return text
+
+
+def channel_coverage(cables: dict, attrs=MEASUREMENT_ATTRS) -> pd.DataFrame:
+    """
+    One row per (cable, test) that has data: rows, missing / duplicated /
+    unmapped counts, and the first few missing and duplicated channel names.
+    """
+    groups: dict = {}  # (cable type, attr) -> [(cable, df)]
+    for cable in cables.values():
+        for attr in attrs:
+            df = getattr(cable, attr, None)
+            if isinstance(df, pd.DataFrame) and not df.empty:
+                groups.setdefault((cable.type, attr), []).append((cable, df))
+
+    tables = []
+    for (cable_type, attr), members in groups.items():
+        channels = np.asarray(members[0][0].order)
+        n_ch = len(channels)
+        codes = [_channel_codes(cable, df) for cable, df in members]
+        owner = np.repeat(np.arange(len(members)), [len(c) for c in codes])
+        codes = np.concatenate(codes)
+
+        mapped = codes >= 0
+        counts = np.bincount(
+            owner[mapped] * n_ch + codes[mapped], minlength=len(members) * n_ch
+        ).reshape(len(members), n_ch)
+        unmapped = np.bincount(owner[~mapped], minlength=len(members))
+        # Rows process_csv dropped before they reached the DataFrame
+        unmapped += np.array([df.attrs.get("unmapped_rows", 0) for _, df in members])
+
+        missing = counts == 0
+        duplicated = counts > 1
+        tables.append(pd.DataFrame({
+            "Serial Number": [cable.serial_number for cable, _ in members],
+            "Type": cable_type,
+            "Test": attr,
+            "Rows": [len(df) for _, df in members],
+            "Missing": missing.sum(axis=1),
+            "Duplicated": duplicated.sum(axis=1),
+            "Unmapped": unmapped,
+            "Missing Channels": [_listed(channels, row) for row in missing],
+            "Duplicated Channels": [_listed(channels, row) for row in duplicated],
+        }))
+
+    if not tables:
+        return pd.DataFrame(columns=[
+            "Serial Number", "Type", "Test", "Rows", "Missing", "Duplicated", "Unmapped",
+            "Missing Channels", "Duplicated Channels",
+        ])
+    table = pd.concat(tables, ignore_index=True)
+    table["Complete"] = (table["Missing"] == 0) & (table["Duplicated"] == 0) & (table["Unmapped"] == 0)
+    return table.sort_values(
+        ["Complete", "Missing", "Unmapped", "Duplicated"], ascending=[True, False, False, False], ignore_index=True
+    )
+
+
+def coverage_summary(coverage: pd.DataFrame) -> pd.DataFrame:
+    """Fleet summary of a `channel_coverage` table, one row per (type, test)."""
+    if coverage.empty:
+        return pd.DataFrame(columns=[
+            "Type", "Test", "Cables", "Complete", "With Missing", "With Duplicated", "With Unmapped",
+            "Missing Channels", "Unmapped Rows",
+        ])
+    grouped = coverage.groupby(["Type", "Test"], sort=True)
+    return pd.DataFrame({
+        "Cables": grouped.size(),
+        "Complete": grouped["Complete"].sum(),
+        "With Missing": grouped["Missing"].apply(lambda s: int((s > 0).sum())),
+        "With Duplicated": grouped["Duplicated"].apply(lambda s: int((s > 0).sum())),
+        "With Unmapped": grouped["Unmapped"].apply(lambda s: int((s > 0).sum())),
+        "Missing Channels": grouped["Missing"].sum(),
+        "Unmapped Rows": grouped["Unmapped"].sum(),
+    }).reset_index()
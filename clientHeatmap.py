@@ -0,0 +1,102 @@
+"""
+Compact JSON heatmap specs for browser-side rendering.
+
+`band_spec` describes one cable heatmap (bands, channel labels, values and
+colour stops) without touching matplotlib; `to_vega_lite` turns it into a
+Vega-Lite chart that Streamlit draws in the browser with per-channel tooltips.
+"""
+import numpy as np
+
+VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+
+
+def _hex(rgb) -> str:
+    return "#" + "".join(f"{round(c * 255):02x}" for c in rgb)
+
+
+def _compact(values, digits: int = 3) -> list:
+    """Rounded floats with NaN as None, so the spec is valid, small JSON."""
+    values = np.round(np.asarray(values, dtype=float), digits)
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def band_spec(cable, values, label: str, vmin: float, vmax: float, title: str = None) -> dict:
+    """Spec for a channel-ordered vector drawn in the cable's band layout."""
+    values = np.asarray(values, dtype=float)
+    if len(values) != len(cable.order):
+        raise ValueError(f"Expected {len(cable.order)} values, got {len(values)}")
+
+    bands, start = [], 0
+    for name, channels in cable.bands:
+        stop = start + len(channels)
+        bands.append({
+            "name": name,
+            "channels": list(channels),
+            "values": _compact(values[start:stop]),
+        })
+        start = stop
+
+    colors = cable.HEATMAP_COLORS
+    stops = np.linspace(0, 1, len(colors))
+    return {
+        "serial": str(cable.serial_number),
+        "type": cable.type,
+        "title": title or f"Heatmap for cable with SN: {cable.serial_number}",
+        "label": label,
+        "vmin": vmin,
+        "vmax": vmax,
+        "colors": [[round(float(s), 4), _hex(c)] for s, c in zip(stops, colors)],
+        "bands": bands,
+    }
+
+
+def to_vega_lite(spec: dict, width: int = 700) -> dict:
+    """Vega-Lite chart for a `band_spec`: one row of cells per band, tooltips per channel."""
+    rows = [
+        {"band": band["name"], "channel": ch, "value": v}
+        for band in spec["bands"]
+        for ch, v in zip(band["channels"], band["values"])
+    ]
+    span = spec["vmax"] - spec["vmin"]
+    domain = [spec["vmin"] + stop * span for stop, _ in spec["colors"]]
+    color_range = [color for _, color in spec["colors"]]
+
+    return {
+        "$schema": VEGA_LITE_SCHEMA,
+        "title": spec["title"],
+        "data": {"values": rows},
+        "facet": {
+            "row": {
+                "field": "band",
+                "type": "nominal",
+                "sort": [band["name"] for band in spec["bands"]],
+                "title": None,
+            }
+        },
+        "spec": {
+            "width": width,
+            "height": 40,
+            "mark": "rect",
+            "encoding": {
+                "x": {
+                    "field": "channel",
+                    "type": "ordinal",
+                    "sort": None,
+                    "title": None,
+                    "axis": {"labelAngle": -90, "labelFontSize": 8},
+                },
+                "color": {
+                    "field": "value",
+                    "type": "quantitative",
+                    "scale": {"domain": domain, "range": color_range, "clamp": True},
+                    "legend": {"title": spec["label"]},
+                },
+                "tooltip": [
+                    {"field": "band", "type": "nominal", "title": "Band"},
+                    {"field": "channel", "type": "nominal", "title": "Channel"},
+                    {"field": "value", "type": "quantitative", "title": spec["label"], "format": ".2f"},
+                ],
+            },
+        },
+        "resolve": {"scale": {"x": "independent"}},
+    }
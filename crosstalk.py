@@ -0,0 +1,103 @@
+"""
+Channel-to-channel leakage correlation (crosstalk) across a fleet.
+
+Builds the cables × channels matrix for one cable type, in the class `order`,
+and computes the channels × channels Pearson correlation with one matrix
+product. Results are cached on the content of the fleet matrix, so reruns with
+the same cables do not recompute.
+"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from fleetStats import fleet_matrix
+
+_CACHE_SIZE = 8
+_cache: OrderedDict = OrderedDict()
+
+
+def correlation_matrix(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation between the columns of a cables × channels matrix.
+    Missing values are replaced by the channel mean; constant channels give NaN.
+    """
+    X = np.asarray(matrix, dtype=np.float64)
+    col_mean = np.nanmean(X, axis=0)
+    X = np.where(np.isnan(X), col_mean, X) - np.nan_to_num(col_mean)
+    norm = np.sqrt((X ** 2).sum(axis=0))
+    X = X / np.where(norm > 0, norm, np.nan)
+    corr = X.T @ X
+    np.fill_diagonal(corr, np.where(norm > 0, 1.0, np.nan))
+    return corr
+
+
+def _digest(matrix: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(matrix.shape).encode())
+    h.update(np.ascontiguousarray(matrix).tobytes())
+    return h.hexdigest()
+
+
+def fleet_correlation(cables: dict, cable_type: str, matrix_type: str = "leakage"):
+    """
+    Cached correlation matrix for every `cable_type` cable with `matrix_type` data.
+    Returns (corr, channels, n_cables) or (None, None, 0) without data.
+    """
+    serials, matrix, channels = fleet_matrix(cables, cable_type, matrix_type)
+    if matrix is None:
+        return None, None, 0
+
+    key = _digest(matrix)
+    corr = _cache.get(key)
+    if corr is None:
+        corr = correlation_matrix(matrix)
+        _cache[key] = corr
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return corr, channels, len(serials)
+
+
+def top_pairs(corr: np.ndarray, channels, n: int = 20) -> pd.DataFrame:
+    """The `n` most strongly correlated distinct channel pairs."""
+    rows, cols = np.triu_indices_from(corr, k=1)
+    values = corr[rows, cols]
+    keep = ~np.isnan(values)
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+    best = np.argsort(-np.abs(values))[:n]
+    names = np.asarray(channels, dtype=object)
+    return pd.DataFrame({
+        "Channel A": names[rows[best]],
+        "Channel B": names[cols[best]],
+        "Correlation": values[best],
+    })
+
+
+def draw_correlation_heatmap(corr: np.ndarray, bands, title: str):
+    """
+    Render the correlation matrix as a single image with the band layout
+    (Top / TopS / BottomS / Bottom) marked on both axes.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 10.5))
+    im = ax.imshow(corr, cmap="RdBu_r", vmin=-1.0, vmax=1.0, interpolation="nearest")
+    fig.colorbar(im, ax=ax, label="Correlation")
+
+    sizes = [len(channels) for _, channels in bands]
+    edges = np.cumsum([0] + sizes)
+    for edge in edges[1:-1]:
+        ax.axhline(edge - 0.5, color="black", linewidth=0.8)
+        ax.axvline(edge - 0.5, color="black", linewidth=0.8)
+
+    centers = (edges[:-1] + edges[1:]) / 2 - 0.5
+    names = [name for name, _ in bands]
+    ax.set_xticks(centers, names)
+    ax.set_yticks(centers, names)
+    ax.tick_params(length=0)
+    ax.set_title(title, fontsize=16)
+    fig.tight_layout()
+    return fig, ax
@@ -0,0 +1,99 @@
+"""
+Heatmap figures that are built and laid out once, then reused for every cable.
+
+The band layout, tick labels and colorbars are identical for all cables of a
+class, so each class gets one template figure drawn by its own `draw_bands`.
+A render swaps the colour data of each band and the title, and when the colour
+scale differs from the last render it also updates the colour limits and the
+colorbar labels in place and redoes the layout. One figure per class (about 20 MB each) keeps the
+memory fixed however many modes and kinds are drawn.
+Templates are not registered with pyplot, so `plt.close()` elsewhere never
+destroys one, and each is locked while it is being filled and saved.
+"""
+import io
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
+
+class FigureTemplate:
+    def __init__(self, cable_cls, label: str, vmin: float, vmax: float):
+        import matplotlib.pyplot as plt
+
+        cable = cable_cls(cable_cls.__name__, 0, "template")
+        fig, axes = cable.draw_bands(np.zeros(len(cable_cls.order)), label=label, vmin=vmin, vmax=vmax, title=" ")
+        # Detach from pyplot; the figure keeps its Agg canvas and can still be saved
+        plt.close(fig)
+
+        self.fig = fig
+        self.layout_rect = cable_cls.layout_rect
+        self.meshes = [ax.collections[0] for ax in np.ravel(axes) if ax.collections]
+        self.sizes = [len(channels) for _, channels in cable_cls.bands]
+        if len(self.meshes) != len(self.sizes):
+            raise ValueError(
+                f"{cable_cls.__name__}.draw_bands drew {len(self.meshes)} heatmaps for {len(self.sizes)} bands"
+            )
+        self.scale = (label, float(vmin), float(vmax))
+        self._lock = threading.Lock()
+
+    def _set_scale(self, label: str, vmin: float, vmax: float):
+        """Colour limits and colorbar label of every band; call with the lock held."""
+        from matplotlib import rcParams
+
+        scale = (label, float(vmin), float(vmax))
+        if scale == self.scale:
+            return
+        for mesh in self.meshes:
+            mesh.set_clim(vmin, vmax)
+            if mesh.colorbar is not None:
+                mesh.colorbar.set_label(label)
+        # Colorbar tick labels change width with the scale, so lay out again as
+        # draw_bands does, starting from the default subplot positions like a new figure
+        self.fig.subplots_adjust(**{k: rcParams[f"figure.subplot.{k}"] for k in SUBPLOT_PARAMS})
+        self.fig.tight_layout(rect=self.layout_rect)
+        self.scale = scale
+
+    @contextmanager
+    def filled(self, values, title: str, label: str, vmin: float, vmax: float):
+        """
+        The template figure showing `values` (in class order) on the given colour
+        scale, locked until the block exits.
+        """
+        values = np.ma.masked_invalid(np.asarray(values, dtype=float))
+        if len(values) != sum(self.sizes):
+            raise ValueError(f"Expected {sum(self.sizes)} values, got {len(values)}")
+
+        with self._lock:
+            self._set_scale(label, vmin, vmax)
+            start = 0
+            for mesh, size in zip(self.meshes, self.sizes):
+                mesh.set_array(values[start:start + size].reshape(1, -1))
+                start += size
+            self.fig.suptitle(title, fontsize=20)
+            yield self.fig
+
+    def png(self, values, title: str, label: str, vmin: float, vmax: float, dpi: int = 100) -> bytes:
+        buf = io.BytesIO()
+        with self.filled(values, title, label, vmin, vmax) as fig:
+            fig.savefig(buf, format="png", dpi=dpi)
+        return buf.getvalue()
+
+
+_templates: dict = {}  # cable class -> FigureTemplate
+_templates_lock = threading.Lock()
+
+
+def get_template(cable_cls, label: str, vmin: float, vmax: float) -> FigureTemplate:
+    """
+    Shared template for this class, built on first use (drawn on the first
+    colour scale asked for; `filled` and `png` switch scales).
+    """
+    with _templates_lock:
+        template = _templates.get(cable_cls)
+        if template is None:
+            template = FigureTemplate(cable_cls, label, vmin, vmax)
+            _templates[cable_cls] = template
+        return template
@@ -0,0 +1,203 @@
+"""
+On-disk history of every cable ever tested, one memory-mapped matrix per
+cable type and test kind.
+
+Each archive is a folder holding
+    values.f32   float32 rows, cables × channels, laid out by the class `order`
+    serials.txt  one serial per row, in row order
+    meta.json    cable type, kind and channel list
+
+Rows are only ever appended (a re-tested cable overwrites its own row), so
+the matrix can be sliced by cable range or channel without copying, and
+statistics are computed chunk by chunk without loading it all into RAM.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from fleetStats import DEFAULT_PERCENTILES, FleetStats, fleet_matrix
+from Tesla import Tesla
+from Paradise import Paradise
+
+CABLE_CLASSES = {"Tesla": Tesla, "Paradise": Paradise}
+ARCHIVE_KINDS = ("leakage", "1s")
+
+_DTYPE = np.float32
+_MIN_CAPACITY = 1024
+
+
+class FleetArchive:
+    """
+    Append-only, memory-mapped cables × channels matrix for one
+    (cable type, kind). Missing channels are stored as NaN.
+    """
+
+    def __init__(self, root, cable_type: str, kind: str):
+        self.cable_type = cable_type
+        self.kind = kind
+        self.channels = list(CABLE_CLASSES[cable_type].order)
+        self.path = Path(root) / f"{cable_type.lower()}_{kind}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._values_path = self.path / "values.f32"
+        self._serials_path = self.path / "serials.txt"
+        self._lock = threading.RLock()
+
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta["channels"] != self.channels:
+                raise ValueError(f"{self.path} was written with a different channel layout")
+        else:
+            meta_path.write_text(json.dumps(
+                {"cable_type": cable_type, "kind": kind, "channels": self.channels}
+            ))
+
+        self.serials = []
+        if self._serials_path.exists():
+            self.serials = self._serials_path.read_text().split()
+        self.index = {serial: row for row, serial in enumerate(self.serials)}
+        self._values_path.touch()
+        self._map()
+
+    def __len__(self):
+        return len(self.serials)
+
+    def __contains__(self, serial):
+        return serial in self.index
+
+    # ---------- storage ----------
+
+    @property
+    def capacity(self) -> int:
+        return os.path.getsize(self._values_path) // (len(self.channels) * _DTYPE().itemsize)
+
+    def _map(self) -> None:
+        capacity = self.capacity
+        if capacity < max(len(self.serials), 1):
+            self._grow(max(len(self.serials), _MIN_CAPACITY))
+            return
+        self._mm = np.memmap(self._values_path, dtype=_DTYPE, mode="r+", shape=(capacity, len(self.channels)))
+
+    def _grow(self, rows: int) -> None:
+        # Extending the file keeps existing rows in place; views taken from the
+        # old mapping stay valid for the rows they cover
+        with open(self._values_path, "r+b") as f:
+            f.truncate(rows * len(self.channels) * _DTYPE().itemsize)
+        self._map()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._mm.flush()
+
+    # ---------- writing ----------
+
+    def append(self, serials, matrix) -> int:
+        """
+        Add cables (matrix is cables × channels in `self.channels` order).
+        Serials already in the archive have their row overwritten.
+        Returns the number of new rows.
+        """
+        matrix = np.asarray(matrix, dtype=_DTYPE)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.channels):
+            raise ValueError(f"Expected a (n, {len(self.channels)}) matrix, got {matrix.shape}")
+
+        with self._lock:
+            rows, new = [], []
+            for serial in serials:
+                row = self.index.get(serial)
+                if row is None:
+                    row = len(self.serials) + len(new)
+                    new.append(serial)
+                    self.index[serial] = row
+                rows.append(row)
+
+            needed = len(self.serials) + len(new)
+            if needed > self.capacity:
+                self._grow(max(needed, 2 * self.capacity))
+            self._mm[rows] = matrix
+            self._mm.flush()
+
+            # serials.txt decides how many rows exist, so it is written last
+            if new:
+                with open(self._serials_path, "a") as f:
+                    f.write("".join(f"{s}\n" for s in new))
+                self.serials.extend(new)
+            return len(new)
+
+    def append_cables(self, cables: dict) -> int:
+        """Add every cable of this archive's type that has data for its kind."""
+        serials, matrix, _ = fleet_matrix(cables, self.cable_type, self.kind)
+        if matrix is None:
+            return 0
+        return self.append(serials, matrix)
+
+    # ---------- zero-copy reads ----------
+
+    @property
+    def values(self) -> np.ndarray:
+        """The whole matrix as a read-through view (cables × channels)."""
+        return self._mm[:len(self.serials)]
+
+    def rows(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """View of cables [start, stop) in archive order."""
+        return self.values[start:stop]
+
+    def channel_slice(self, first, last=None) -> np.ndarray:
+        """
+        View of a contiguous channel range, by name or position, inclusive of
+        `last` (defaults to just `first`). Shaped cables × channels.
+        """
+        start = self._channel_pos(first)
+        stop = self._channel_pos(last if last is not None else first) + 1
+        return self.values[:, start:stop]
+
+    def vector(self, serial) -> np.ndarray:
+        """One cable's row, or None if the serial is not archived."""
+        row = self.index.get(serial)
+        return None if row is None else self.values[row]
+
+    def iter_chunks(self, chunk_rows: int = 4096):
+        """Yield (start row, view) blocks of at most `chunk_rows` cables."""
+        total = len(self.serials)
+        for start in range(0, total, chunk_rows):
+            yield start, self._mm[start:min(start + chunk_rows, total)]
+
+    def _channel_pos(self, channel) -> int:
+        if isinstance(channel, (int, np.integer)):
+            return int(channel)
+        return self.channels.index(channel)
+
+    # ---------- derived results ----------
+
+    def stats(self, chunk_rows: int = 4096) -> FleetStats:
+        """Per-channel statistics over every archived cable, read chunk by chunk."""
+        return FleetStats.from_chunks(self.channels, (chunk for _, chunk in self.iter_chunks(chunk_rows)))
+
+    def stats_frame(self, qs=DEFAULT_PERCENTILES, chunk_rows: int = 4096):
+        return self.stats(chunk_rows).to_frame(qs)
+
+    def draw_heatmap(self, serial):
+        """(fig, ax) heatmap for one archived cable."""
+        values = self.vector(serial)
+        if values is None:
+            raise KeyError(serial)
+        cable = CABLE_CLASSES[self.cable_type](self.cable_type, 0, serial)
+        return cable.draw_leakage_values(np.nan_to_num(np.asarray(values, dtype=float)))
+
+    def draw_median_heatmap(self, chunk_rows: int = 4096):
+        """(fig, ax) heatmap of the per-channel median over the whole archive."""
+        median = self.stats(chunk_rows).percentiles((50,))[0]
+        cable = CABLE_CLASSES[self.cable_type](self.cable_type, 0, f"{self.cable_type} fleet median")
+        return cable.draw_leakage_values(np.nan_to_num(median))
+
+
+def open_archives(root, kinds=ARCHIVE_KINDS) -> dict:
+    """{(cable type, kind): FleetArchive} for every cable type under `root`."""
+    return {
+        (cable_type, kind): FleetArchive(root, cable_type, kind)
+        for cable_type in CABLE_CLASSES
+        for kind in kinds
+    }
@@ -0,0 +1,47 @@
+"""
+Multi-page PDF report of the heatmaps for every cable in a lot.
+
+Each page is drawn into the cable class's shared figure template and
+written straight to the PDF, so peak memory is one figure whatever the
+number of cables.
+"""
+import time
+
+REPORT_MATRIX_TYPES = ("leakage", "1s")
+
+
+def write_fleet_report(cables, dest, matrix_types=REPORT_MATRIX_TYPES, progress=None) -> dict:
+    """
+    Writes one page per (cable, matrix type) that has data to `dest`
+    (a path or binary file object). `cables` is any iterable of Cable objects.
+    `progress(pages, cable_index, n_cables)` is called after each cable.
+    Returns {"pages", "seconds", "pages_per_second"}.
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    cables = list(cables)
+    pages = 0
+    start = time.perf_counter()
+
+    with PdfPages(dest) as pdf:
+        for i, cable in enumerate(cables, start=1):
+            for matrix_type in matrix_types:
+                values = cable.ordered_vector(matrix_type)
+                if values is None:
+                    continue
+                # Same page as draw_heatmap, drawn into the shared figure template
+                with cable.mode_figure(values, matrix_type=matrix_type) as fig:
+                    pdf.savefig(fig)
+                pages += 1
+            if progress:
+                progress(pages, i, len(cables))
+
+        info = pdf.infodict()
+        info["Title"] = f"Cable heatmap report ({len(cables)} cables)"
+
+    seconds = time.perf_counter() - start
+    return {
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_second": pages / seconds if seconds > 0 else 0.0,
+    }
@@ -0,0 +1,247 @@
+"""
+Streaming per-channel statistics across all cables of one type.
+
+Vectors follow the cable class's `order`, so column i is always the same
+channel. Mean and standard deviation are merged batch by batch (Chan et al.
+parallel variance), and percentiles come from a fixed log-spaced histogram per
+channel, so adding or replacing a cable never re-scans the rest of the fleet.
+"""
+import numpy as np
+import pandas as pd
+
+# Histogram bin edges shared by every channel: symmetric log spacing from
+# 1e-2 to 1e9 (about 4% wide bins), which covers pA leakage and mOhm resistance.
+_POS_EDGES = np.logspace(-2, 9, 661)
+HIST_EDGES = np.concatenate((-_POS_EDGES[::-1], [0.0], _POS_EDGES))
+
+DEFAULT_PERCENTILES = (5, 50, 95, 99)
+
+
+def fleet_matrix(cables: dict, cable_type: str, matrix_type: str, fill: float = np.nan, column: int = 1):
+    """
+    Stack the ordered vectors of every `cable_type` cable that has `matrix_type` data
+    (`column` 1 is the measured value, 2 the expected value).
+    Returns (serials, matrix, channels) with matrix shaped cables × channels,
+    or ([], None, None) if there is no data.
+    """
+    serials, rows, channels = [], [], None
+    for cable in cables.values():
+        if getattr(cable, "type", None) != cable_type:
+            continue
+        vec = cable.ordered_vector(matrix_type, column=column, fill=fill)
+        if vec is None:
+            continue
+        serials.append(cable.serial_number)
+        rows.append(vec)
+        channels = cable.order
+
+    if not rows:
+        return [], None, None
+    return serials, np.vstack(rows), list(channels)
+
+
+def _batch_moments(matrix: np.ndarray):
+    """Per-channel count, mean and sum of squared deviations, ignoring NaN."""
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=0)
+    sums = np.where(valid, matrix, 0.0).sum(axis=0)
+    mean = np.divide(sums, count, out=np.zeros(matrix.shape[1]), where=count > 0)
+    dev = np.where(valid, matrix - mean, 0.0)
+    return count, mean, (dev ** 2).sum(axis=0)
+
+
+class FleetStats:
+    """
+    Incrementally maintained per-channel mean, std and percentiles.
+    Each cable contributes one vector; updating a serial that was already
+    added replaces its previous contribution.
+    """
+
+    def __init__(self, channels):
+        self.channels = list(channels)
+        n_ch = len(self.channels)
+        self.count = np.zeros(n_ch, dtype=np.int64)
+        self.mean = np.zeros(n_ch)
+        self._m2 = np.zeros(n_ch)
+        self._hist = np.zeros((n_ch, len(HIST_EDGES) - 1), dtype=np.int64)
+        self._vectors: dict = {}
+
+    @classmethod
+    def from_chunks(cls, channels, chunks) -> "FleetStats":
+        """
+        Statistics over blocks of cables × channels, merged one block at a time.
+        The cables are anonymous, so they cannot be replaced or removed later.
+        """
+        stats = cls(channels)
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=float)
+            if len(chunk):
+                stats._add(chunk)
+        return stats
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def __contains__(self, serial):
+        return serial in self._vectors
+
+    @property
+    def serials(self):
+        return list(self._vectors)
+
+    def update(self, serial, vector) -> bool:
+        """Add or replace one cable. Returns True if the statistics changed."""
+        return self.update_many([serial], np.asarray(vector, dtype=float)[None, :]) > 0
+
+    def update_many(self, serials, matrix: np.ndarray) -> int:
+        """
+        Add or replace several cables at once (matrix is cables × channels).
+        Unchanged cables are skipped. Returns the number of cables applied.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.channels):
+            raise ValueError(
+                f"Expected a (n, {len(self.channels)}) matrix, got {matrix.shape}"
+            )
+
+        new_rows, old_rows, changed = [], [], []
+        for i, serial in enumerate(serials):
+            old = self._vectors.get(serial)
+            if old is not None:
+                if np.array_equal(old, matrix[i], equal_nan=True):
+                    continue
+                old_rows.append(old)
+            new_rows.append(i)
+            changed.append(serial)
+
+        if old_rows:
+            self._remove(np.vstack(old_rows))
+        if new_rows:
+            added = matrix[new_rows]
+            self._add(added)
+            for serial, vec in zip(changed, added):
+                self._vectors[serial] = vec.copy()
+        return len(new_rows)
+
+    def remove(self, serials) -> int:
+        """Drop cables from the statistics. Unknown serials are ignored."""
+        rows = [self._vectors.pop(s) for s in list(serials) if s in self._vectors]
+        if rows:
+            self._remove(np.vstack(rows))
+        return len(rows)
+
+    # ---------- merge / un-merge ----------
+
+    def _histogram(self, matrix: np.ndarray) -> np.ndarray:
+        n_bins = len(HIST_EDGES) - 1
+        valid = ~np.isnan(matrix)
+        bins = np.clip(np.searchsorted(HIST_EDGES, matrix, side="right") - 1, 0, n_bins - 1)
+        flat = (np.arange(matrix.shape[1]) * n_bins + bins)[valid]
+        return np.bincount(flat, minlength=matrix.shape[1] * n_bins).reshape(-1, n_bins)
+
+    def _add(self, matrix: np.ndarray) -> None:
+        nb, mean_b, m2_b = _batch_moments(matrix)
+        n = self.count + nb
+        delta = mean_b - self.mean
+        self.mean = self.mean + np.divide(delta * nb, n, out=np.zeros_like(delta), where=n > 0)
+        self._m2 = self._m2 + m2_b + np.divide(
+            delta ** 2 * self.count * nb, n, out=np.zeros_like(delta), where=n > 0
+        )
+        self.count = n
+        self._hist += self._histogram(matrix)
+
+    def _remove(self, matrix: np.ndarray) -> None:
+        nb, mean_b, m2_b = _batch_moments(matrix)
+        n_a = self.count - nb
+        mean_a = np.divide(
+            self.count * self.mean - nb * mean_b, n_a, out=np.zeros_like(self.mean), where=n_a > 0
+        )
+        delta = mean_b - mean_a
+        m2_a = self._m2 - m2_b - np.divide(
+            delta ** 2 * n_a * nb, self.count, out=np.zeros_like(delta), where=self.count > 0
+        )
+        self._m2 = np.where(n_a > 0, np.maximum(m2_a, 0.0), 0.0)
+        self.mean = mean_a
+        self.count = n_a
+        self._hist -= self._histogram(matrix)
+
+    # ---------- results ----------
+
+    @property
+    def std(self) -> np.ndarray:
+        """Sample standard deviation per channel (NaN with fewer than 2 values)."""
+        out = np.full(len(self.channels), np.nan)
+        ok = self.count > 1
+        out[ok] = np.sqrt(self._m2[ok] / (self.count[ok] - 1))
+        return out
+
+    def percentiles(self, qs=DEFAULT_PERCENTILES) -> np.ndarray:
+        """
+        Approximate percentiles per channel, interpolated inside histogram bins.
+        Returns an array shaped len(qs) × channels.
+        """
+        n_ch = len(self.channels)
+        rows = np.arange(n_ch)
+        cum = np.cumsum(self._hist, axis=1)
+        out = np.full((len(qs), n_ch), np.nan)
+
+        for i, q in enumerate(qs):
+            target = self.count * (q / 100.0)
+            b = np.minimum((cum < target[:, None]).sum(axis=1), self._hist.shape[1] - 1)
+            in_bin = self._hist[rows, b]
+            below = cum[rows, b] - in_bin
+            frac = np.clip(
+                np.divide(target - below, in_bin, out=np.zeros(n_ch), where=in_bin > 0), 0.0, 1.0
+            )
+            lo, hi = HIST_EDGES[b], HIST_EDGES[b + 1]
+            out[i] = np.where(self.count > 0, lo + frac * (hi - lo), np.nan)
+        return out
+
+    def median(self) -> np.ndarray:
+        """Approximate per-channel median (NaN for channels without data), e.g. for deviation heatmaps."""
+        return self.percentiles((50,))[0]
+
+    def to_frame(self, qs=DEFAULT_PERCENTILES) -> pd.DataFrame:
+        """Per-channel summary table in channel order."""
+        mean = np.where(self.count > 0, self.mean, np.nan)
+        table = pd.DataFrame({
+            "Channel": self.channels,
+            "Count": self.count,
+            "Mean": mean,
+            "Std": self.std,
+        })
+        for q, values in zip(qs, self.percentiles(qs)):
+            table[f"P{q:g}"] = values
+        return table
+
+
+def sync_fleet_stats(stats: FleetStats, cables: dict, cable_type: str, matrix_type: str, serials=None) -> int:
+    """
+    Bring `stats` in line with the current cables: new or re-tested cables are
+    merged in, cables no longer present are removed. With `serials` (the
+    cables ingested since the last sync) only those are looked at, so a sync
+    costs the number of changes rather than the size of the fleet.
+    Returns cables changed.
+    """
+    if serials is None:
+        serials, matrix, _ = fleet_matrix(cables, cable_type, matrix_type)
+        present = set(serials)
+        gone = [s for s in stats.serials if s not in present]
+    else:
+        found, rows, gone = [], [], []
+        for serial in serials:
+            cable = cables.get(serial)
+            vec = None
+            if getattr(cable, "type", None) == cable_type:
+                vec = cable.ordered_vector(matrix_type, fill=np.nan)
+            if vec is None:
+                gone.append(serial)
+            else:
+                found.append(serial)
+                rows.append(vec)
+        serials, matrix = found, np.vstack(rows) if rows else None
+
+    changed = stats.remove(gone)
+    if matrix is not None:
+        changed += stats.update_many(serials, matrix)
+    return changed
@@ -0,0 +1,153 @@
+"""
+Background ingestion of uploaded reports.
+
+An IngestJob parses submitted files one at a time on a worker thread. After
+every file it publishes a fresh snapshot of its cables, so readers see each
+cable as soon as its reports are parsed and never iterate a dict that is
+still growing. Published cables are never modified again: a report for a
+cable that is already published is parsed into a copy of it, which replaces
+it in the next snapshot. Files are identified by upload id (or name), so
+submitting the same uploads again on a rerun costs nothing, and new uploads
+are queued behind the ones already parsed. A job that is replaced must be cancelled,
+so two workers never write the same cable folders at once.
+"""
+import threading
+import time
+from collections import deque
+
+from uploadData import identify_cable, ingest_report
+
+
+def upload_key(uploaded_file):
+    """Identity of an upload across reruns: Streamlit's file id, else its name and size."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id:
+        return file_id
+    return (uploaded_file.name, getattr(uploaded_file, "size", None))
+
+
+class IngestJob:
+    def __init__(self, index=None):
+        self.index = index           # SerialIndex cables are recorded in (None: the shared one)
+        self.keys: set = set()       # every submitted upload
+        self.skipped: list = []      # names with no recognised serial number
+        self.errors: list = []       # (name, message) of files that failed to parse
+        self.total = 0
+        self.done = 0
+        self.version = 0             # bumped on every publish
+        self._published: list = []   # serial number ingested by each version (None if none)
+        self._cables: dict = {}      # published snapshot
+        self._working: dict = {}     # worker's own dict
+        self._queue: deque = deque()
+        self._started = None         # start of the current batch
+        self._finished = None
+        self._batch_base = 0         # `done` when the current batch started
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def covers(self, uploaded_files) -> bool:
+        """True if every upload this job has seen is still among `uploaded_files`."""
+        return self.keys <= {upload_key(f) for f in uploaded_files}
+
+    def submit(self, uploaded_files) -> int:
+        """Queue the uploads not submitted before and make sure the worker runs. Returns how many were new."""
+        new = 0
+        with self._lock:
+            if self._cancelled.is_set():
+                return 0
+            for uploaded_file in uploaded_files:
+                key = upload_key(uploaded_file)
+                if key in self.keys:
+                    continue
+                self.keys.add(key)
+                self._queue.append(uploaded_file)
+                self.total += 1
+                new += 1
+            # The worker clears _thread under the lock as it exits, so none is stranded
+            if new and self._thread is None:
+                self._started = time.perf_counter()
+                self._finished = None
+                self._batch_base = self.done
+                self._thread = threading.Thread(target=self._run, name="ingest", daemon=True)
+                self._thread.start()
+        return new
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self.done < self.total
+
+    def snapshot(self):
+        """(version, cables published so far as serial number -> Cable); do not modify the dict."""
+        with self._lock:
+            return self.version, self._cables
+
+    def changed_serials(self, since: int, until: int = None) -> set:
+        """Serial numbers ingested after version `since`, up to and including `until`."""
+        with self._lock:
+            return {s for s in self._published[since:until] if s is not None}
+
+    def progress(self) -> dict:
+        """{"done", "total", "seconds", "files_per_second", "eta_seconds"} of the current batch."""
+        with self._lock:
+            done, total, started, finished = self.done, self.total, self._started, self._finished
+            base = self._batch_base
+        if started is None:
+            return {"done": done, "total": total, "seconds": 0.0, "files_per_second": 0.0, "eta_seconds": None}
+        seconds = (finished or time.perf_counter()) - started
+        rate = (done - base) / seconds if seconds > 0 else 0.0
+        return {
+            "done": done,
+            "total": total,
+            "seconds": seconds,
+            "files_per_second": rate,
+            "eta_seconds": (total - done) / rate if rate > 0 else None,
+        }
+
+    def cancel(self, timeout: float = None) -> bool:
+        """
+        Drop the queued uploads and stop the worker once the file it is
+        parsing is written; blocks until it has stopped. Later submits are
+        ignored. False if `timeout` ran out first.
+        """
+        self._cancelled.set()
+        with self._lock:
+            self.total -= len(self._queue)
+            self._queue.clear()
+        return self.wait(timeout)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the queue is empty; False if `timeout` ran out first."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.running
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._queue or self._cancelled.is_set():
+                    self._finished = time.perf_counter()
+                    self._thread = None
+                    return
+                uploaded_file = self._queue.popleft()
+
+            name = uploaded_file.name
+            info = identify_cable(name)
+            if info is not None and info[0] in self._working:
+                # Readers may hold the published cable; update a copy instead
+                self._working[info[0]] = self._working[info[0]].copy()
+            try:
+                cable = ingest_report(self._working, name, uploaded_file, self.index)
+            except Exception as exc:
+                cable = False
+                self.errors.append((name, f"{type(exc).__name__}: {exc}"))
+            if cable is None:
+                self.skipped.append(name)
+
+            with self._lock:
+                self._cables = dict(self._working)
+                self._published.append(cable.serial_number if cable else None)
+                self.done += 1
+                self.version += 1
@@ -0,0 +1,63 @@
+"""
+Measured-vs-expected margins for a fleet of cables.
+
+`process_csv` keeps the expected value of every row next to the measurement
+(Expected_pA / Expected_R (mOhm)). The expected value is treated as the limit:
+a channel passes when measured / expected <= 1.
+"""
+import numpy as np
+import pandas as pd
+
+from fleetStats import fleet_matrix
+
+
+def margin_matrix(cables: dict, cable_type: str, matrix_type: str):
+    """
+    Measured / expected for every `cable_type` cable, in one vectorized pass.
+    Returns (serials, ratio, passed, channels); ratio is cables × channels with
+    NaN where a channel is missing or has no expected value, and passed is
+    True / False only where ratio is defined.
+    """
+    serials, measured, channels = fleet_matrix(cables, cable_type, matrix_type, column=1)
+    if measured is None:
+        return [], None, None, None
+    _, expected, _ = fleet_matrix(cables, cable_type, matrix_type, column=2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(expected > 0, measured / expected, np.nan)
+    passed = ratio <= 1.0
+    return serials, ratio, passed, channels
+
+
+def cable_pass_rates(serials, ratio: np.ndarray, passed: np.ndarray) -> pd.DataFrame:
+    """One row per cable: channels tested, failed, pass rate and worst margin."""
+    tested = (~np.isnan(ratio)).sum(axis=1)
+    failed = tested - passed.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(tested > 0, 1.0 - failed / tested, np.nan)
+    worst = np.full(len(serials), np.nan)
+    has_any = tested > 0
+    worst[has_any] = np.nanmax(ratio[has_any], axis=1)
+    return pd.DataFrame({
+        "Serial Number": serials,
+        "Channels Tested": tested,
+        "Channels Failed": failed,
+        "Pass Rate": rate,
+        "Worst Ratio": worst,
+    }).sort_values("Worst Ratio", ascending=False, ignore_index=True)
+
+
+def channel_pass_rates(channels, ratio: np.ndarray, passed: np.ndarray) -> pd.DataFrame:
+    """One row per channel (class order): cables tested, failed and fleet pass rate."""
+    tested = (~np.isnan(ratio)).sum(axis=0)
+    failed = tested - passed.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(tested > 0, 1.0 - failed / tested, np.nan)
+        median = np.where(tested > 0, np.nanmedian(np.where(tested > 0, ratio, 0.0), axis=0), np.nan)
+    return pd.DataFrame({
+        "Channel": channels,
+        "Cables Tested": tested,
+        "Cables Failed": failed,
+        "Pass Rate": rate,
+        "Median Ratio": median,
+    })
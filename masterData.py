@@ -0,0 +1,277 @@
+"""
+Master tables and per-cable output folders, shared by the app, the batch CLI
+and the watch-folder daemon.
+"""
+import importlib.util
+import io
+import os
+import zipfile
+
+import pandas as pd
+
+from artifactStore import digest
+from runHistory import RUNS_DIR
+
+
+def master_column(cable, attr_name: str):
+    """
+    One cable's contribution to a master table: [shared_key, <serial_number>],
+    deduplicated by taking the max per key. None if the cable has no data.
+    """
+    df = getattr(cable, attr_name, None)
+    if df is None or df.empty:
+        return None
+
+    # Work with first two columns: [shared_key, measurement]
+    tmp = df.iloc[:, :2].copy()
+    shared_col = tmp.columns[0]
+    meas_col   = tmp.columns[1]
+
+    # Ensure measurement is numeric for max calculation
+    tmp[meas_col] = pd.to_numeric(tmp[meas_col], errors="coerce")
+
+    # 1) Deduplicate within this cable: max per key (reports rarely repeat a
+    # channel, so the group-by is skipped when they don't)
+    if tmp[shared_col].duplicated().any():
+        tmp = (
+            tmp.groupby(shared_col, as_index=False, observed=True)
+               .agg({meas_col: "max"})
+        )
+
+    # 2) Rename measurement column to the cable's serial number
+    tmp.columns = [shared_col, cable.serial_number]
+    return tmp
+
+
+def build_master_dataframe(
+    cables: dict,
+    cable_type: str,
+    attr_name: str,
+):
+    """
+    Build a master DataFrame for the given cable type and data attribute.
+    - Deduplicates each cable's DataFrame by taking the max per key (first column).
+    - Outer-joins all cables on the shared first column.
+    """
+
+    dfs = []
+
+    for cable in cables.values():
+        if getattr(cable, "type", None) != cable_type:
+            continue
+
+        tmp = master_column(cable, attr_name)
+        if tmp is not None:
+            dfs.append(tmp)
+
+    if not dfs:
+        return None, f"No {attr_name} data found for {cable_type} cables."
+
+    # Use the first DataFrame's first column name as the join key
+    key_col = dfs[0].columns[0]
+
+    # 3) Outer-join all cables on the shared key in one pass. Keys are unique
+    # per cable after step 1, so no duplicates remain to be collapsed.
+    master_df = pd.concat([df_i.set_index(df_i.columns[0]) for df_i in dfs], axis=1, join="outer")
+
+    # 4) Sort by the shared key: categorical channels sort in connector
+    # order, anything else numerically if possible
+    # (errors="ignore" was removed in pandas 3, so fall back explicitly)
+    if not isinstance(master_df.index.dtype, pd.CategoricalDtype):
+        try:
+            master_df.index = pd.to_numeric(master_df.index)
+        except (ValueError, TypeError):
+            pass
+    # copy() consolidates the one-block-per-cable frame that concat returns
+    master_df = master_df.sort_index().copy()
+    master_df.index.name = key_col
+    master_df = master_df.reset_index()
+
+    return master_df, None
+
+
+# Master export formats: name -> (file extension, MIME type, optional module it needs)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", None),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+}
+
+# Cells serialised at a time; master rows hold one value per cable, so wider
+# tables are written a few rows at a time
+EXPORT_CHUNK_CELLS = 65536
+
+# Parquet row groups repeat per-column metadata, so they are never this small
+PARQUET_MIN_ROW_GROUP = 1024
+
+# Columns in one Excel worksheet
+EXCEL_MAX_COLUMNS = 16384
+
+
+def export_formats() -> list:
+    """Names in EXPORT_FORMATS whose optional dependency is installed."""
+    return [
+        name for name, (_, _, module) in EXPORT_FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def _row_chunks(df: pd.DataFrame, chunk_rows: int):
+    # At least one (possibly empty) chunk, so headers and schemas are always written
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def export_master(master_df: pd.DataFrame, dest, fmt: str = "CSV", chunk_rows: int = None):
+    """
+    Writes a master table to `dest` (a path or binary file object) as
+    `fmt`, `chunk_rows` rows at a time (by default about EXPORT_CHUNK_CELLS
+    cells), so only one chunk is ever held as text or encoded rows.
+    """
+    if chunk_rows is None:
+        chunk_rows = max(1, EXPORT_CHUNK_CELLS // max(master_df.shape[1], 1))
+    if fmt == "CSV":
+        close = isinstance(dest, (str, os.PathLike))
+        out = open(dest, "wb") if close else dest
+        try:
+            for i, chunk in enumerate(_row_chunks(master_df, chunk_rows)):
+                out.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+        finally:
+            if close:
+                out.close()
+
+    elif fmt == "Parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # One row group per chunk
+        schema = pa.Schema.from_pandas(master_df, preserve_index=False)
+        with pq.ParquetWriter(dest, schema) as writer:
+            for chunk in _row_chunks(master_df, max(chunk_rows, PARQUET_MIN_ROW_GROUP)):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    elif fmt == "Excel":
+        from openpyxl import Workbook
+
+        if master_df.shape[1] > EXCEL_MAX_COLUMNS:
+            raise ValueError(
+                f"{master_df.shape[1] - 1} cables do not fit in one Excel sheet; export CSV or Parquet instead."
+            )
+        # Write-only workbooks stream rows to disk instead of keeping cell objects
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("master")
+        sheet.append([str(c) for c in master_df.columns])
+        for chunk in _row_chunks(master_df, chunk_rows):
+            cells = chunk.astype(object).where(chunk.notna(), None)
+            for row in cells.itertuples(index=False, name=None):
+                sheet.append(row)
+        workbook.save(dest)
+
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def master_export_bytes(cables: dict, cable_type: str, attr_name: str, fmt: str = "CSV") -> bytes:
+    """Master table for (cable_type, attr_name) exported as `fmt`; raises ValueError if there is no data."""
+    master_df, err = build_master_dataframe(cables, cable_type=cable_type, attr_name=attr_name)
+    if err:
+        raise ValueError(err)
+    buf = io.BytesIO()
+    export_master(master_df, buf, fmt)
+    return buf.getvalue()
+
+
+# Measurement attribute -> file name prefix of its filtered CSV in the cable's folder
+OUTPUT_FILE_PREFIXES = {
+    "leakage": "leakage",
+    "leakage_1s": "1sleakage",
+    "resistance": "resistance",
+    "inv_resistance": "inv_resistance",
+    "continuity": "continuity",
+    "inv_continuity": "inv_continuity",
+}
+
+
+def output_file_name(cable, attr: str) -> str:
+    """Name of the filtered CSV `process_csv` writes for `attr`, e.g. leakage_11_0300000001.csv."""
+    return f"{OUTPUT_FILE_PREFIXES[attr]}_{cable.length}_{cable.serial_number}.csv"
+
+
+def cable_folder(cable, base_map=None, temp_root="."):
+    """
+    Returns (target_dir, None) for the cable's output folder, else (None, error_msg).
+    """
+    if base_map is None:
+        base_map = {"Tesla": "teslaTemp", "Paradise": "paradiseTemp"}
+
+    base_dir = base_map.get(cable.type)
+    if not base_dir:
+        return None, f"Unknown cable_type '{cable.type}'"
+    
+
+    if not cable.serial_number:
+        return None, "Missing serial number"
+    
+    length_folder = f"{cable.length}"
+    target_dir = os.path.join(
+        temp_root,
+        base_dir,
+        length_folder,
+        str(cable.serial_number)
+    )
+    return target_dir, None
+
+
+def output_files(target_dir):
+    """Paths of the cable's output files under target_dir, leaving out its run history."""
+    for root, dirs, files in os.walk(target_dir):
+        if root == target_dir and RUNS_DIR in dirs:
+            dirs.remove(RUNS_DIR)
+        for fname in files:
+            yield os.path.join(root, fname)
+
+
+def folder_signature(target_dir):
+    """
+    (relative path, size, mtime_ns) of every output file under target_dir, for cache keys.
+    Only stats the files: ingestion writes each cable's outputs once per upload,
+    so a changed file always has a new mtime or size.
+    """
+    entries = []
+    for path in output_files(target_dir):
+        info = os.stat(path)
+        entries.append((os.path.relpath(path, target_dir), info.st_size, info.st_mtime_ns))
+    return digest(sorted(entries))
+
+
+def build_zip_for_cable(cable, base_map=None, temp_root="."):
+    """
+    Returns (zip_buffer, zip_name) if success, else (None, error_msg).
+    Expects folder structure:
+      TeslaTemp/<serial_number>/...
+      ParadiseTemp/<serial_number>/...
+    """
+    target_dir, err = cable_folder(cable, base_map, temp_root)
+    if err:
+        return None, err
+    
+    if not os.path.isdir(target_dir):
+        return None, f"Folder not found: {target_dir}"
+
+    # Check folder is not empty
+    paths = list(output_files(target_dir))
+    if not paths:
+        return None, f"No files in {target_dir}"
+
+    # Build ZIP in memory
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for abs_path in paths:
+            # Make paths inside the zip start at <serial_number>/...
+            rel_from_sn = os.path.relpath(abs_path, start=target_dir)
+            arcname = os.path.join(str(cable.serial_number), rel_from_sn)
+            zf.write(abs_path, arcname=arcname)
+
+    zip_buffer.seek(0)
+    zip_name = f"{cable.serial_number}_data.zip"
+    return zip_buffer, zip_name
@@ -0,0 +1,126 @@
+"""
+Parallel heatmap rendering in a pool of worker processes.
+
+Matplotlib rendering is CPU-bound and holds the GIL, so heatmaps are drawn
+in separate processes. Each worker imports matplotlib / seaborn and builds its
+figure templates at start-up, so jobs only pay for the data update and save. A job is
+(cable type, serial, ordered vector, matrix type, mode) and comes back as PNG bytes.
+"""
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from artifactStore import digest
+from Tesla import Tesla
+from Paradise import Paradise
+
+CABLE_CLASSES = {"Tesla": Tesla, "Paradise": Paradise}
+
+# sys.modules["__main__"] is process-wide; only one pool start may swap it at a time
+_main_swap_lock = threading.Lock()
+
+
+def _warm_worker():
+    """Process initializer: select the Agg backend and build the Measured figure templates."""
+    import matplotlib
+    matplotlib.use("Agg")
+    for cls in CABLE_CLASSES.values():
+        cls(cls.__name__, 0, "warmup").mode_png(np.zeros(len(cls.order)))
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def render_png(cable_type, serial_number, values, matrix_type, mode="Measured") -> bytes:
+    """Draw one heatmap from an ordered vector and return it as PNG bytes."""
+    cable = CABLE_CLASSES[cable_type](cable_type, 0, serial_number)
+    return cable.mode_png(values, mode, matrix_type=matrix_type)
+
+
+def heatmap_job(cable, matrix_type, mode="Measured", fleet_median=None):
+    """
+    Picklable job for `cable`, or None if it has no data for `matrix_type`.
+    Returns (cache key, args); the key matches the one the app uses for server PNGs.
+    `fleet_median` is only used by the "Vs fleet median" mode.
+    """
+    values = cable.heatmap_values(matrix_type, mode, fleet_median)
+    if values is None:
+        return None
+    key = ("heatmap", cable.serial_number, matrix_type, mode, digest(values))
+    return key, (cable.type, cable.serial_number, values, matrix_type, mode)
+
+
+class RenderService:
+    """Process pool for heatmap jobs, started on first use."""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the Streamlit server is multi-threaded, so forking is unsafe
+                executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+                # Under `streamlit run`, __main__ is the app script and spawned
+                # workers would re-execute it. Start every worker now, while
+                # __main__ points at this module instead.
+                this = sys.modules[__name__]
+                with _main_swap_lock:
+                    main = sys.modules["__main__"]
+                    sys.modules["__main__"] = this
+                    try:
+                        started = [executor.submit(_worker_pid) for _ in range(self.max_workers)]
+                    finally:
+                        # A session's script run may have installed its own __main__ meanwhile
+                        if sys.modules["__main__"] is this:
+                            sys.modules["__main__"] = main
+                for future in started:
+                    future.result()
+                self._executor = executor
+            return self._executor
+
+    def render_many(self, jobs, progress=None):
+        """
+        Render `jobs` ([(key, args), ...]) in parallel.
+        Yields (key, png_bytes) as each finishes; `progress(done, total)` is
+        called after every job.
+        """
+        jobs = [job for job in jobs if job is not None]
+        if not jobs:
+            return
+        pool = self._pool()
+        futures = {pool.submit(render_png, *args): key for key, args in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            yield futures[future], future.result()
+            if progress:
+                progress(done, len(jobs))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_render_service() -> RenderService:
+    """Process-wide render service shared by all sessions."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RenderService()
+        return _service
@@ -0,0 +1,126 @@
+"""
+Append-only history of every run of one test on one cable.
+
+Each run is stored as its ordered vector (float32, in the cable's `order`),
+so earlier runs can be compared without re-reading the original reports:
+    <name>.f32   one row per run
+    <name>.log   one line per run: UTC time, report digest, report name
+The log line is written after the row, so a crash mid-append leaves no run.
+A report that was already recorded (same digest) is not added again.
+Several writers (app sessions, ingest threads, the watch-folder daemon) may
+append to the same history: each append holds a lock on the log, re-reads the
+runs on disk and writes its row after the last logged one.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl  # POSIX: also locks out other processes
+except ImportError:
+    fcntl = None
+
+_DTYPE = np.float32
+
+# Sub-folder of a cable's output folder that holds its histories
+RUNS_DIR = "runs"
+
+# Writers in this process take one of a fixed set of locks, picked by log path
+_LOCK_STRIPES = 64
+_path_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+
+@contextmanager
+def _locked(log_path: Path):
+    """Exclusive hold on one history, across threads and (where fcntl exists) processes."""
+    lock = _path_locks[hash(str(log_path.resolve())) % _LOCK_STRIPES]
+    with lock, open(log_path, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class RunHistory:
+    def __init__(self, folder, name: str, n_channels: int):
+        self.folder = Path(folder)
+        self.n_channels = n_channels
+        self._values_path = self.folder / f"{name}.f32"
+        self._log_path = self.folder / f"{name}.log"
+        self._load()
+
+    def _load(self):
+        """Read the runs on disk: one per log line whose row was written."""
+        self.entries = []  # (timestamp, digest, source) per run
+        if self._log_path.exists():
+            for line in self._log_path.read_text().splitlines():
+                if line.strip():
+                    timestamp, report_digest, source = (line.split("\t") + ["", ""])[:3]
+                    self.entries.append((timestamp, report_digest, source))
+
+        values = np.zeros((0, self.n_channels), dtype=_DTYPE)
+        if self._values_path.exists():
+            values = np.fromfile(self._values_path, dtype=_DTYPE)
+            values = values[:len(self.entries) * self.n_channels].reshape(-1, self.n_channels)
+        self._values = values
+        # Drop log lines whose row never made it to disk
+        self.entries = self.entries[:len(self._values)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, report_digest):
+        return any(entry[1] == report_digest for entry in self.entries)
+
+    def append(self, vector, report_digest: str = "", source: str = "") -> bool:
+        """Record one run. Returns False if this report is already in the history."""
+        row = np.asarray(vector, dtype=_DTYPE).reshape(1, self.n_channels)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with _locked(self._log_path):
+            # Pick up runs other writers appended since this history was read
+            self._load()
+            if report_digest and report_digest in self:
+                return False
+
+            mode = "r+b" if self._values_path.exists() else "wb"
+            with open(self._values_path, mode) as f:
+                # Overwrite anything past the last logged run (a crashed append)
+                f.seek(len(self.entries) * row.nbytes)
+                f.write(row.tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = (datetime.now(timezone.utc).isoformat(timespec="seconds"), report_digest, source)
+            with open(self._log_path, "a") as f:
+                f.write("\t".join(entry) + "\n")
+            self.entries.append(entry)
+            self._values = np.vstack((self._values, row))
+        return True
+
+    @property
+    def values(self) -> np.ndarray:
+        """All runs, oldest first, shaped runs × channels (read-only view)."""
+        view = self._values.view()
+        view.flags.writeable = False
+        return view
+
+    def run(self, index: int = -1):
+        """Vector of one run (0 = first, -1 = latest) as float, or None."""
+        if not self.entries or not -len(self.entries) <= index < len(self.entries):
+            return None
+        return self._values[index].astype(float)
+
+    def delta(self, start: int = -2, end: int = -1):
+        """Run `end` minus run `start`, or None if either does not exist."""
+        a, b = self.run(start), self.run(end)
+        if a is None or b is None:
+            return None
+        return b - a
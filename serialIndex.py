@@ -0,0 +1,196 @@
+"""
+Persistent index of every processed cable, in SQLite.
+
+One row per cable (serial number, type, length, output folder) and one per
+filtered measurement file, updated as reports are ingested. Serial numbers
+are the primary key (case-insensitive), so exact, prefix and range lookups are
+B-tree searches; lot prefixes such as "0312" are just serial prefixes. A
+cable's folder and files come straight from the index, with no walk of the
+teslaTemp / paradiseTemp trees. `rebuild` backfills the index from those
+trees once, for folders written before the index existed.
+
+    cableIndex.sqlite   (or $CABLE_INDEX_PATH)
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from masterData import OUTPUT_FILE_PREFIXES, cable_folder, output_file_name
+
+DEFAULT_INDEX_PATH = os.environ.get("CABLE_INDEX_PATH", "cableIndex.sqlite")
+DEFAULT_BASE_MAP = {"Tesla": "teslaTemp", "Paradise": "paradiseTemp"}
+
+# Largest code point; appended to a prefix it bounds every serial starting with it
+_PREFIX_END = "\U0010ffff"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cables (
+    serial  TEXT PRIMARY KEY COLLATE NOCASE,
+    type    TEXT NOT NULL,
+    length  INTEGER NOT NULL,
+    folder  TEXT NOT NULL,
+    updated TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cables_type_length ON cables (type, length, serial);
+CREATE TABLE IF NOT EXISTS files (
+    serial TEXT NOT NULL COLLATE NOCASE,
+    attr   TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    PRIMARY KEY (serial, attr)
+) WITHOUT ROWID;
+"""
+
+
+class SerialIndex:
+    """Thread-safe handle on the index database at `path`."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL with NORMAL sync: a commit per ingested file does not wait on fsync
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cables").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- updates ----------
+
+    def add_cables(self, entries) -> int:
+        """
+        Insert or update cables in one transaction. `entries` yields
+        (serial, type, length, folder, {attr: path}); listed files replace
+        the cable's earlier ones of the same attr. Returns how many were written.
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        count = 0
+        with self._lock, self._conn:
+            for serial, cable_type, length, folder, files in entries:
+                self._conn.execute(
+                    "INSERT INTO cables (serial, type, length, folder, updated) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (serial) DO UPDATE SET type = excluded.type, length = excluded.length, "
+                    "folder = excluded.folder, updated = excluded.updated",
+                    (str(serial), cable_type, int(length), str(folder), now),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (serial, attr, path) VALUES (?, ?, ?)",
+                    [(str(serial), attr, str(path)) for attr, path in files.items()],
+                )
+                count += 1
+        return count
+
+    def add_cable(self, cable, base_map=None, temp_root=".") -> bool:
+        """Index `cable`'s output folder and the filtered CSV of every test it has data for."""
+        folder, err = cable_folder(cable, base_map, temp_root)
+        if err:
+            return False
+        files = {
+            attr: os.path.join(folder, output_file_name(cable, attr))
+            for attr in OUTPUT_FILE_PREFIXES
+            if getattr(cable, attr, None) is not None
+        }
+        return self.add_cables([(cable.serial_number, cable.type, cable.length, folder, files)]) == 1
+
+    def remove(self, serial) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE serial = ?", (str(serial),))
+            return self._conn.execute("DELETE FROM cables WHERE serial = ?", (str(serial),)).rowcount > 0
+
+    def rebuild(self, temp_root=".", base_map=None) -> int:
+        """
+        Index every <base>/<length>/<serial> folder under `temp_root` (one
+        pass over the output trees). Returns the number of cables indexed.
+        """
+        base_map = base_map or DEFAULT_BASE_MAP
+        prefixes = {f"{prefix}_": attr for attr, prefix in OUTPUT_FILE_PREFIXES.items()}
+
+        def entries():
+            for cable_type, base_dir in base_map.items():
+                base = os.path.join(temp_root, base_dir)
+                if not os.path.isdir(base):
+                    continue
+                for length_entry in os.scandir(base):
+                    if not length_entry.is_dir() or not length_entry.name.isdigit():
+                        continue
+                    for serial_entry in os.scandir(length_entry.path):
+                        if not serial_entry.is_dir():
+                            continue
+                        serial = serial_entry.name
+                        files = {}
+                        expected = {f"{prefix}{length_entry.name}_{serial}.csv": attr for prefix, attr in prefixes.items()}
+                        for file_entry in os.scandir(serial_entry.path):
+                            attr = expected.get(file_entry.name)
+                            if attr is not None:
+                                files[attr] = file_entry.path
+                        yield serial, cable_type, int(length_entry.name), serial_entry.path, files
+
+        return self.add_cables(entries())
+
+    # ---------- queries ----------
+
+    def lookup(self, serial):
+        """{"serial", "type", "length", "folder", "updated", "files": {attr: path}} or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM cables WHERE serial = ?", (str(serial),)).fetchone()
+            if row is None:
+                return None
+            files = self._conn.execute(
+                "SELECT attr, path FROM files WHERE serial = ? ORDER BY attr", (str(serial),)
+            ).fetchall()
+        entry = dict(row)
+        entry["files"] = {f["attr"]: f["path"] for f in files}
+        return entry
+
+    def search(self, prefix: str = "", cable_type=None, length=None, start=None, end=None, limit: int = 1000) -> list:
+        """
+        Cables whose serial starts with `prefix` and lies in [`start`, `end`]
+        (both optional, inclusive), optionally of one type and length, in
+        serial order. Returns at most `limit` dicts without their file lists.
+        """
+        clauses, params = [], []
+        if prefix:
+            clauses.append("serial >= ? AND serial < ?")
+            params += [prefix, prefix + _PREFIX_END]
+        if start:
+            clauses.append("serial >= ?")
+            params.append(start)
+        if end:
+            clauses.append("serial <= ?")
+            params.append(end)
+        if cable_type:
+            clauses.append("type = ?")
+            params.append(cable_type)
+        if length is not None:
+            clauses.append("length = ?")
+            params.append(int(length))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM cables {where} ORDER BY serial LIMIT ?", (*params, int(limit))
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_indexes: dict = {}
+_indexes_lock = threading.Lock()
+
+
+def get_serial_index(path=None) -> SerialIndex:
+    """Shared index for `path` (default DEFAULT_INDEX_PATH), opened on first use."""
+    key = os.path.abspath(path or DEFAULT_INDEX_PATH)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SerialIndex(key)
+            _indexes[key] = index
+        return index
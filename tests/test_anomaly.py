@@ -0,0 +1,35 @@
+"""Robust z-scores against a stored fleet baseline."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anomaly import FleetBaseline, score_matrix  # noqa: E402
+
+
+def fleet():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(100.0, 10.0, (50, 4))
+    matrix[:, 1] = 5.0          # constant channel: MAD is zero
+    matrix[0, 1] = 50.0         # one cable deviates on it
+    return matrix
+
+
+def test_zero_mad_channel_still_scores():
+    matrix = fleet()
+    baseline = FleetBaseline.from_matrix(matrix, ["A", "B", "C", "D"])
+    assert baseline.mad[1] == 0
+    _, flagged, _ = score_matrix(matrix, baseline)
+    assert flagged[0, 1]
+    assert not flagged[1:, 1].any()
+
+
+def test_score_does_not_depend_on_batch():
+    matrix = fleet()
+    baseline = FleetBaseline.from_matrix(matrix, ["A", "B", "C", "D"])
+    together = baseline.robust_z(matrix)
+    for i in (0, 1, 7):
+        np.testing.assert_array_equal(baseline.robust_z(matrix[i]), together[i:i + 1])
+    np.testing.assert_array_equal(baseline.robust_z(matrix[:2]), together[:2])
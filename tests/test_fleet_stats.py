@@ -0,0 +1,63 @@
+"""Incremental fleet statistics: syncing only the serials ingested since the last sync."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from fleetStats import FleetStats, fleet_matrix, sync_fleet_stats  # noqa: E402
+from ingestJob import IngestJob  # noqa: E402
+from serialIndex import SerialIndex  # noqa: E402
+from test_ingest_job import Upload, run  # noqa: E402
+
+
+def full_stats(cables):
+    _, _, channels = fleet_matrix(cables, "Tesla", "leakage")
+    stats = FleetStats(channels)
+    sync_fleet_stats(stats, cables, "Tesla", "leakage")
+    return stats
+
+
+def test_sync_only_looks_at_given_serials():
+    cables = synthetic.make_fleet(20, "Tesla")
+    stats = full_stats(cables)
+    serial = synthetic.serial_for("Tesla", 3)
+    other = synthetic.serial_for("Tesla", 4)
+    cables[serial].leakage = synthetic.make_cable("Tesla", 3, np.random.default_rng(9)).leakage
+    cables[other].leakage = synthetic.make_cable("Tesla", 4, np.random.default_rng(9)).leakage
+
+    # Only `serial` is reported as changed, so `other` keeps its old vector
+    assert sync_fleet_stats(stats, cables, "Tesla", "leakage", {serial}) == 1
+    np.testing.assert_array_equal(stats._vectors[serial], cables[serial].ordered_vector("leakage", fill=np.nan))
+    assert not np.array_equal(stats._vectors[other], cables[other].ordered_vector("leakage", fill=np.nan))
+
+
+def test_incremental_sync_matches_full_sync():
+    cables = synthetic.make_fleet(30, "Tesla")
+    first = dict(list(cables.items())[:10])
+    stats = full_stats(first)
+    new = set(cables) - set(first)
+    assert sync_fleet_stats(stats, cables, "Tesla", "leakage", new) == 20
+
+    full = full_stats(cables)
+    assert sorted(stats.serials) == sorted(full.serials)
+    np.testing.assert_allclose(stats.mean, full.mean)
+    np.testing.assert_allclose(stats.std, full.std)
+    np.testing.assert_allclose(stats.median(), full.median())
+
+
+def test_ingest_job_reports_changed_serials(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = synthetic.write_reports(tmp_path / "drop", 3, tests=("leakage",))
+    job = IngestJob(SerialIndex(str(tmp_path / "cableIndex.sqlite")))
+
+    first, _ = run(job, [Upload(p) for p in paths[:1]])
+    second, _ = run(job, [Upload(p) for p in paths])
+    serials = [synthetic.serial_for("Tesla", i) for i in range(3)]
+    assert job.changed_serials(0, first) == {serials[0]}
+    assert job.changed_serials(first, second) == set(serials[1:])
+    assert job.changed_serials(second) == set()
+    job.index.close()
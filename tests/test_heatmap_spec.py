@@ -0,0 +1,28 @@
+"""Browser-side heatmap specs: a spec per mode with data, None without."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from clientHeatmap import to_vega_lite  # noqa: E402
+
+
+def test_spec_with_data():
+    cable = synthetic.make_cable("Tesla", 0, np.random.default_rng(0))
+    for mode in ("Measured", "Margin", "Difference"):
+        spec = cable.mode_spec("leakage", mode)
+        assert [band["name"] for band in spec["bands"]] == [name for name, _ in cable.bands]
+        assert to_vega_lite(spec)
+
+
+def test_spec_without_data_is_none():
+    cable = synthetic.make_cable("Paradise", 0, np.random.default_rng(0))
+    assert cable.mode_spec("continuity") is None
+    assert cable.mode_spec("leakage", "Run change") is None  # no run recorded
+    assert cable.mode_spec("leakage", "Vs fleet median") is None
+    assert cable.heatmap_spec("inv_resistance") is None
+    assert cable.margin_spec("continuity") is None
@@ -0,0 +1,48 @@
+"""Background ingestion: cables are never modified once they are published."""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from ingestJob import IngestJob  # noqa: E402
+from serialIndex import SerialIndex  # noqa: E402
+
+
+class Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.file_id = path
+
+
+def run(job, uploads):
+    job.submit(uploads)
+    assert job.wait(timeout=60)
+    return job.snapshot()
+
+
+def test_published_cables_are_not_modified(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    leakage = synthetic.write_reports(tmp_path / "drop", 2, tests=("leakage",))
+    leakage_1s = synthetic.write_reports(tmp_path / "drop", 2, tests=("leakage_1s",))
+    job = IngestJob(SerialIndex(str(tmp_path / "cableIndex.sqlite")))
+
+    _, first = run(job, [Upload(p) for p in leakage])
+    serial = synthetic.serial_for("Tesla", 0)
+    published = first[serial]
+    vector = published.ordered_vector("leakage").copy()
+
+    _, second = run(job, [Upload(p) for p in leakage + leakage_1s])
+    assert second[serial] is not published
+    assert second[serial].leakage_1s is not None
+    assert published.leakage_1s is None
+    assert published.run_history("1s") is None
+    assert (published.ordered_vector("leakage") == vector).all()
+    job.index.close()
+
@@ -0,0 +1,65 @@
+"""
+Per-cable output folders: the ZIP download and the folder signature cover the
+report CSVs written by ingestion, not the run history stored beside them, and
+the signature changes whenever one of those CSVs is rewritten.
+"""
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from masterData import build_zip_for_cable, cable_folder, folder_signature  # noqa: E402
+from serialIndex import SerialIndex  # noqa: E402
+from uploadData import ingest_report  # noqa: E402
+
+
+def ingest(tmp_path, paths, cables=None):
+    cables = {} if cables is None else cables
+    index = SerialIndex(str(tmp_path / "cableIndex.sqlite"))
+    for path in paths:
+        with open(path, "rb") as f:
+            ingest_report(cables, os.path.basename(path), f, index)
+    index.close()
+    return cables
+
+
+def test_zip_leaves_out_run_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cables = ingest(tmp_path, synthetic.write_reports(tmp_path / "drop", 1))
+    cable = next(iter(cables.values()))
+    target_dir, _ = cable_folder(cable)
+    assert os.path.isdir(os.path.join(target_dir, "runs"))
+
+    zip_buf, _ = build_zip_for_cable(cable)
+    names = zipfile.ZipFile(zip_buf).namelist()
+    assert len(names) == 2
+    assert all(name.startswith(f"{cable.serial_number}/") and name.endswith(".csv") for name in names)
+
+
+def test_folder_signature_follows_rewrites(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = synthetic.write_reports(tmp_path / "drop", 1, tests=("leakage",))
+    cables = ingest(tmp_path, paths)
+    cable = next(iter(cables.values()))
+    target_dir, _ = cable_folder(cable)
+    signature = folder_signature(target_dir)
+    assert folder_signature(target_dir) == signature
+
+    # Recording a run only touches runs/
+    cable.record_run("leakage", target_dir, "another-report")
+    assert folder_signature(target_dir) == signature
+
+    # Re-ingesting rewrites the CSV with new values
+    synthetic.write_reports(tmp_path / "drop", 1, tests=("leakage",), seed=1)
+    ingest(tmp_path, paths, cables)
+    rewritten = folder_signature(target_dir)
+    assert rewritten != signature
+
+    # A rewrite of the same size still has a new mtime
+    path = os.path.join(target_dir, next(p for p in os.listdir(target_dir) if p.endswith(".csv")))
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    assert folder_signature(target_dir) != rewritten
@@ -0,0 +1,48 @@
+"""
+Ingestion records cables in the SerialIndex it is given, so lookups and
+searches on that index see them and the shared default index is untouched.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from api import CableService  # noqa: E402
+from batch import load_reports  # noqa: E402
+from serialIndex import DEFAULT_INDEX_PATH, SerialIndex  # noqa: E402
+
+
+def test_load_reports_uses_given_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    synthetic.write_reports(tmp_path / "drop", 3)
+    index = SerialIndex(str(tmp_path / "lot.sqlite"))
+    assert len(index) == 0  # an empty index is falsy; it must still be used
+
+    cables = load_reports(tmp_path / "drop", index)
+    assert len(index) == 3
+    for serial, cable in cables.items():
+        entry = index.lookup(serial)
+        assert entry["type"] == cable.type
+        assert set(entry["files"]) == {"leakage", "leakage_1s"}
+        assert all(os.path.exists(path) for path in entry["files"].values())
+    assert not (tmp_path / DEFAULT_INDEX_PATH).exists()
+    index.close()
+
+
+def test_api_ingest_and_search_share_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = synthetic.write_reports(tmp_path / "drop", 2, cable_type="Paradise")
+    service = CableService(index=SerialIndex(str(tmp_path / "api.sqlite")))
+    for path in paths:
+        with open(path, "rb") as f:
+            service.ingest(os.path.basename(path), f.read())
+
+    serial = synthetic.serial_for("Paradise", 1)
+    assert [row["serial"] for row in service.search({"type": ["Paradise"]})] == [
+        synthetic.serial_for("Paradise", 0), serial
+    ]
+    assert service.cable_files(serial)["folder"].endswith(serial)
+    assert not (tmp_path / DEFAULT_INDEX_PATH).exists()
+    service.index.close()
@@ -0,0 +1,77 @@
+"""
+Watch-folder ingestion against a local temp directory: files are picked up
+once they settle, ingested once, re-ingested when changed, and the master
+tables land in `master_dir`.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402  (puts the repository root on sys.path)
+
+from serialIndex import SerialIndex  # noqa: E402
+from watchFolder import FolderWatcher  # noqa: E402
+
+
+def make_watcher(tmp_path, settle_seconds=0.0):
+    index = SerialIndex(str(tmp_path / "cableIndex.sqlite"))
+    watcher = FolderWatcher(tmp_path / "drop", settle_seconds=settle_seconds,
+                            master_dir=tmp_path / "masters", index=index)
+    return watcher, index
+
+
+def test_files_wait_for_settle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # process_csv writes teslaTemp/ relative to the cwd
+    synthetic.write_reports(tmp_path / "drop", 2)
+    watcher, index = make_watcher(tmp_path, settle_seconds=3600)
+
+    assert watcher.poll_once()["ingested"] == 0
+    assert watcher.poll_once()["ingested"] == 0
+    assert not watcher.cables
+    index.close()
+
+
+def test_ingests_new_files_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    synthetic.write_reports(tmp_path / "drop", 3)
+    watcher, index = make_watcher(tmp_path)
+
+    assert watcher.poll_once()["ingested"] == 0  # first sighting starts the settle clock
+    summary = watcher.poll_once()
+    assert summary["ingested"] == 6
+    assert sorted(watcher.cables) == [synthetic.serial_for("Tesla", i) for i in range(3)]
+    assert (tmp_path / "teslaTemp").is_dir()
+
+    leakage = tmp_path / "masters" / "tesla_leakage.csv"
+    assert leakage in summary["masters_written"]
+    master = pd.read_csv(leakage)
+    assert set(watcher.cables) <= set(master.columns)
+    assert index.lookup(synthetic.serial_for("Tesla", 0)) is not None
+
+    assert watcher.poll_once()["ingested"] == 0
+    index.close()
+
+
+def test_changed_file_is_reingested(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = synthetic.write_reports(tmp_path / "drop", 2)
+    watcher, index = make_watcher(tmp_path)
+    watcher.poll_once()
+    assert watcher.poll_once()["ingested"] == 4
+
+    path = paths[0]
+    with open(path) as f:
+        text = f.read()
+    with open(path, "w") as f:
+        f.write(text + "\n")
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+
+    assert watcher.poll_once()["ingested"] == 0
+    summary = watcher.poll_once()
+    assert summary["ingested"] == 1
+    assert summary["masters_written"] == [tmp_path / "masters" / "tesla_leakage.csv"]
+    index.close()
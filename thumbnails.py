@@ -0,0 +1,85 @@
+"""
+Small heatmap strips for table rows, built without matplotlib.
+
+A thumbnail is the cable's band layout as an RGB array: one row of cells per
+band, one cell per channel, coloured through the HEATMAP_COLORS ramp. All
+cables of a class are coloured in one vectorized pass: the ordered vectors
+are stacked, scaled to lookup-table indices and gathered into pixels.
+Thumbnails are cached on the cable next to its ordered vectors, so only new
+or re-tested cables are coloured on a rerun.
+"""
+import numpy as np
+
+# Pixels per channel cell (height, width)
+CELL = (4, 2)
+LUT_SIZE = 256
+# Missing channels
+NAN_RGB = (200, 200, 200)
+# Band rows shorter than the longest are padded with
+PAD_RGB = (255, 255, 255)
+
+
+def colour_lut(colors, n: int = LUT_SIZE) -> np.ndarray:
+    """(n, 3) uint8 ramp through evenly spaced `colors`, as Cable.heatmap_cmap draws them."""
+    colors = np.asarray(colors, dtype=float)
+    nodes = np.linspace(0, 1, len(colors))
+    x = np.linspace(0, 1, n)
+    ramp = np.stack([np.interp(x, nodes, colors[:, i]) for i in range(3)], axis=1)
+    return np.round(ramp * 255).astype(np.uint8)
+
+
+def _layout(cable_cls) -> np.ndarray:
+    """(bands, longest band) positions into `order`, -1 where a band row is padded."""
+    width = max(len(channels) for _, channels in cable_cls.bands)
+    layout = np.full((len(cable_cls.bands), width), -1)
+    start = 0
+    for row, (_, channels) in enumerate(cable_cls.bands):
+        layout[row, :len(channels)] = np.arange(start, start + len(channels))
+        start += len(channels)
+    return layout
+
+
+def thumbnail_strips(cable_cls, matrix: np.ndarray, vmin: float, vmax: float, cell=CELL) -> np.ndarray:
+    """
+    RGB thumbnails for a (cables, channels) matrix in `cable_cls.order`:
+    uint8 array shaped (cables, bands * cell height, longest band * cell width, 3).
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=float))
+    lut = np.vstack([colour_lut(cable_cls.HEATMAP_COLORS), NAN_RGB, PAD_RGB]).astype(np.uint8)
+    nan_index, pad_index = LUT_SIZE, LUT_SIZE + 1
+
+    scaled = (matrix - vmin) / (vmax - vmin) * (LUT_SIZE - 1)
+    index = np.clip(np.nan_to_num(scaled, nan=0.0), 0, LUT_SIZE - 1).astype(np.intp)
+    index[np.isnan(matrix)] = nan_index
+
+    layout = _layout(cable_cls)
+    cells = index[:, np.maximum(layout, 0)]  # (cables, bands, width)
+    cells[:, layout < 0] = pad_index
+    pixels = lut[cells]  # (cables, bands, width, 3)
+    return pixels.repeat(cell[0], axis=1).repeat(cell[1], axis=2)
+
+
+def cable_thumbnails(cables, matrix_type: str = "leakage") -> dict:
+    """
+    {serial_number: RGB thumbnail or None} for `cables` (any iterable), on
+    the measurement's full colour scale. Cables without a cached thumbnail
+    for their current data are coloured together, one batch per class.
+    """
+    thumbnails, pending = {}, {}
+    for cable in cables:
+        vector = cable.ordered_vector(matrix_type, fill=np.nan)
+        if vector is None:
+            thumbnails[cable.serial_number] = None
+            continue
+        cached = cable.cached_thumbnail(matrix_type)
+        if cached is not None:
+            thumbnails[cable.serial_number] = cached
+        else:
+            pending.setdefault(type(cable), []).append((cable, vector))
+
+    for cable_cls, members in pending.items():
+        _, _, vmax = cable_cls.kind(matrix_type)
+        strips = thumbnail_strips(cable_cls, np.stack([vector for _, vector in members]), 0.0, vmax)
+        for (cable, _), strip in zip(members, strips):
+            thumbnails[cable.serial_number] = cable.cache_thumbnail(matrix_type, strip)
+    return thumbnails
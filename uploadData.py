@@ -1,9 +1,15 @@
 import pandas as pd
 from io import StringIO  
 import re
+import hashlib
 
 from pathlib import Path
 
+from Tesla import Tesla
+from Paradise import Paradise
+from masterData import output_file_name
+from serialIndex import get_serial_index
+
 UNIT_TO_PA = {
     "pa": 1, "pamps": 1, "pamp": 1,
     "na": 1e3, "namps": 1e3, "namp": 1e3,
@@ -21,6 +27,16 @@ UNIT_TO_MOHM = {
     "megaohm": 1e9, "mohm_big": 1e9,           # MΩ → mOhm
     "uohm": 1e-3, "microohm": 1e-3, "microohms": 1e-3  # µΩ → mOhm
 }
+SERIAL_PATTERN = re.compile(r"(?<![A-Za-z0-9])0[0-4][A-Za-z0-9]{8}(?![A-Za-z0-9])", re.IGNORECASE)
+
+# Second digit of the serial number -> (cable type, length in inches)
+SERIAL_TYPES = {
+    "0": ("Paradise", 11),
+    "1": ("Paradise", 15),
+    "3": ("Tesla", 11),
+    "4": ("Tesla", 15),
+}
+
 def is_continuity(testname):
     return "continuity-test-revc" in testname.lower()
 
@@ -95,13 +111,18 @@ def to_mO(value, unit):
     return value * mult if mult else None
 
             
-def process_csv(cable, fname):
+def process_csv(cable, fname, source=None):
     if(cable.type == "Tesla"):
         output_root = "teslaTemp"
     elif(cable.type == "Paradise"):
         output_root = "paradiseTemp"
     test_name = ""
-    content = fname.read().decode("utf-8", errors="ignore")
+    raw = fname.read()
+    # Identifies the report in the cable's run history, so re-uploads are not recorded twice
+    report_digest = hashlib.blake2b(raw, digest_size=12).hexdigest()
+    if source is None:
+        source = getattr(fname, "name", "")
+    content = raw.decode("utf-8", errors="ignore")
     lines = content.splitlines()
     try:
         header_idx = next(i for i, line in enumerate(lines) if "Instruction Type" in line)
@@ -169,11 +190,16 @@ def process_csv(cable, fname):
             "Channel": channels,
             "Measured_pA": measured_pa,
             "Expected_pA": expected_pa,
-        }).dropna()
+        })
+        # Rows whose channel could not be parsed; kept for the coverage report
+        unmapped_rows = int(df_extracted["Channel"].isna().sum())
+        df_extracted = df_extracted.dropna()
+        df_extracted.attrs["unmapped_rows"] = unmapped_rows
+        df_extracted = cable.compact_frame(df_extracted)
 
 
         if(is_leakage(test_name)):
-            filtered_name = f"leakage_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "leakage")
             
             filtered_path = (
                 Path(output_root)
@@ -185,8 +211,9 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.leakage = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
+            cable.record_run("leakage", filtered_path.parent, report_digest, source)
         elif(is_1s_leakage(test_name)):
-            filtered_name = f"1sleakage_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "leakage_1s")
             
             filtered_path = (
                 Path(output_root)
@@ -197,6 +224,7 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.leakage_1s = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
+            cable.record_run("leakage_1s", filtered_path.parent, report_digest, source)
 
     elif(is_resistance(test_name) or is_inv_resistance(test_name) or is_continuity(test_name) or is_inv_continuity(test_name)):
         col_from, col_measured, col_expected = "From Points", "Value Measured", "Value Expected"
@@ -218,10 +246,15 @@ def process_csv(cable, fname):
             "Channel": channels,
             "Measured_R (mOhm)": measured_r,
             "Expected_R (mOhm)": expected_r,
-        }).dropna()
+        })
+        # Rows whose channel could not be parsed; kept for the coverage report
+        unmapped_rows = int(df_extracted["Channel"].isna().sum())
+        df_extracted = df_extracted.dropna()
+        df_extracted.attrs["unmapped_rows"] = unmapped_rows
+        df_extracted = cable.compact_frame(df_extracted)
 
         if(is_resistance(test_name)):
-            filtered_name = f"resistance_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "resistance")
             
             filtered_path = (
                 Path(output_root)
@@ -232,8 +265,9 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.resistance = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
+            cable.record_run("resistance", filtered_path.parent, report_digest, source)
         elif(is_inv_resistance(test_name)):
-            filtered_name = f"inv_resistance_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "inv_resistance")
             
             filtered_path = (
                 Path(output_root)
@@ -244,8 +278,9 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.inv_resistance = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
+            cable.record_run("inv_resistance", filtered_path.parent, report_digest, source)
         elif(is_continuity(test_name)):
-            filtered_name = f"continuity_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "continuity")
             
             filtered_path = (
                 Path(output_root)
@@ -256,9 +291,10 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.continuity = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
+            cable.record_run("continuity", filtered_path.parent, report_digest, source)
             type = "Continuity"
         elif(is_inv_continuity(test_name)):
-            filtered_name = f"inv_continuity_{cable.length}_{cable.serial_number}.csv"
+            filtered_name = output_file_name(cable, "inv_continuity")
             
             filtered_path = (
                 Path(output_root)
@@ -269,5 +305,52 @@ def process_csv(cable, fname):
             filtered_path = filtered_path / filtered_name
             cable.inv_continuity = df_extracted
             df_extracted.to_csv(filtered_path, index=False)
- 
+            cable.record_run("inv_continuity", filtered_path.parent, report_digest, source)
+
+
+def identify_cable(name):
+    """
+    Finds the serial number in a report file name.
+    Returns (serial_number, cable_type, cable_length), or None if there is no
+    serial number or its second digit is not a known cable type.
+    """
+    match = SERIAL_PATTERN.search(name)
+    if not match:
+        return None
+    serial_number = match.group()
+    cable_info = SERIAL_TYPES.get(serial_number[1])
+    if cable_info is None:
+        return None
+    return (serial_number, *cable_info)
+
+
+def create_cable(cable_type, cable_length, serial_number):
+    if cable_type == "Tesla":
+        return Tesla(cable_type, cable_length, serial_number)
+    elif cable_type == "Paradise":
+        return Paradise(cable_type, cable_length, serial_number)
+    else:
+        raise ValueError(f"Unknown cable type: {cable_type}")
+
+
+def ingest_report(cables, name, fname, index=None):
+    """
+    Processes one report into `cables` (serial number -> Cable), creating the
+    cable on first sight. `fname` is any binary file-like object.
+    Returns the cable, or None if the file name has no usable serial number.
+    The cable's output folder and files are recorded in `index` (a
+    SerialIndex; default the shared one at DEFAULT_INDEX_PATH).
+    """
+    info = identify_cable(name)
+    if info is None:
+        return None
+    serial_number, cable_type, cable_length = info
+
+    cable = cables.get(serial_number)
+    if cable is None:
+        cable = create_cable(cable_type, cable_length, serial_number)
+        cables[serial_number] = cable
 
+    process_csv(cable, fname, source=name)
+    (index if index is not None else get_serial_index()).add_cable(cable)
+    return cable
@@ -0,0 +1,183 @@
+"""
+Watch-folder ingestion for tester output directories.
+
+Polls a directory for new or changed report CSVs and ingests each one once it
+has stopped changing for `settle_seconds`, so half-written files are skipped
+until the tester finishes. Per-cable outputs are written by `process_csv` as
+usual. The master tables affected by a poll are rewritten once at the end of
+it, from per-cable columns that are only rebuilt for re-ingested cables.
+With `archive_dir`, leakage vectors are also appended to the fleet archive.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from uploadData import identify_cable, ingest_report
+from masterData import master_column
+from fleetArchive import FleetArchive
+
+# Measurement attribute -> fleet archive kind
+ARCHIVE_ATTRS = {"leakage": "leakage", "leakage_1s": "1s"}
+MEASUREMENT_ATTRS = ["leakage", "leakage_1s", "resistance", "inv_resistance", "continuity", "inv_continuity"]
+
+
+class FolderWatcher:
+    """
+    Incremental ingestion of `directory` into `cables` (serial -> Cable).
+    Call `poll_once` repeatedly (or `run`); each call ingests the files that
+    are ready and returns a summary.
+    """
+
+    def __init__(self, directory, cables=None, settle_seconds: float = 2.0, master_dir="masterTables",
+                 archive_dir=None, index=None):
+        self.directory = Path(directory)
+        self.index = index  # SerialIndex ingested cables are recorded in (None: the shared one)
+        self.cables = {} if cables is None else cables
+        self.settle_seconds = settle_seconds
+        self.master_dir = Path(master_dir) if master_dir else None
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self._archives: dict = {}  # (cable type, kind) -> FleetArchive
+        self._done: dict = {}      # path -> (size, mtime_ns) last ingested
+        self._pending: dict = {}   # path -> ((size, mtime_ns), first seen with that signature)
+        self._columns: dict = {}   # (cable type, attr) -> {serial: DataFrame}
+        self.files_ingested = 0
+        self.files_skipped = 0
+
+    def scan(self) -> list:
+        """Paths that are new or changed and have been stable for `settle_seconds`."""
+        now = time.monotonic()
+        ready = []
+        present = set()
+        for root, _, files in os.walk(self.directory):
+            for fname in files:
+                if not fname.lower().endswith(".csv"):
+                    continue
+                path = os.path.join(root, fname)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                present.add(path)
+                signature = (info.st_size, info.st_mtime_ns)
+                if self._done.get(path) == signature:
+                    continue
+
+                pending = self._pending.get(path)
+                if pending is None or pending[0] != signature:
+                    # New, or still being written: restart the settle clock
+                    self._pending[path] = (signature, now)
+                elif now - pending[1] >= self.settle_seconds:
+                    ready.append((path, signature))
+
+        for path in list(self._pending):
+            if path not in present:
+                del self._pending[path]
+        return ready
+
+    def poll_once(self) -> dict:
+        """Ingest every ready file and rewrite the master tables they touched."""
+        start = time.perf_counter()
+        touched = set()
+        archived: dict = {}        # (cable type, kind) -> {serial: vector}
+        ingested = skipped = 0
+
+        for path, signature in self.scan():
+            cable = self.cables.get(self._serial_hint(path))
+            before = self._snapshot(cable)
+            try:
+                with open(path, "rb") as f:
+                    cable = ingest_report(self.cables, os.path.basename(path), f, self.index)
+            except Exception as exc:
+                print(f"Failed to ingest {path}: {exc}", file=sys.stderr)
+                cable = None
+
+            self._done[path] = signature
+            self._pending.pop(path, None)
+            if cable is None:
+                skipped += 1
+                continue
+            ingested += 1
+
+            after = self._snapshot(cable)
+            for attr in MEASUREMENT_ATTRS:
+                if after[attr] is not None and after[attr] is not before.get(attr):
+                    column = master_column(cable, attr)
+                    self._columns.setdefault((cable.type, attr), {})[cable.serial_number] = column
+                    touched.add((cable.type, attr))
+                    if self.archive_dir is not None and attr in ARCHIVE_ATTRS:
+                        kind = ARCHIVE_ATTRS[attr]
+                        vector = cable.ordered_vector(kind, fill=float("nan"))
+                        archived.setdefault((cable.type, kind), {})[cable.serial_number] = vector
+
+        for (cable_type, kind), vectors in archived.items():
+            self.archive(cable_type, kind).append(list(vectors), list(vectors.values()))
+
+        written = [self.write_master(cable_type, attr) for cable_type, attr in sorted(touched)]
+        self.files_ingested += ingested
+        self.files_skipped += skipped
+        seconds = time.perf_counter() - start
+        return {
+            "ingested": ingested,
+            "skipped": skipped,
+            "masters_written": [p for p in written if p],
+            "seconds": seconds,
+            "files_per_second": ingested / seconds if ingested and seconds > 0 else 0.0,
+        }
+
+    def archive(self, cable_type: str, kind: str) -> FleetArchive:
+        key = (cable_type, kind)
+        if key not in self._archives:
+            self._archives[key] = FleetArchive(self.archive_dir, cable_type, kind)
+        return self._archives[key]
+
+    def master_table(self, cable_type: str, attr: str):
+        """Current master table for (cable_type, attr), or None."""
+        columns = [c for c in self._columns.get((cable_type, attr), {}).values() if c is not None]
+        if not columns:
+            return None
+        key_col = columns[0].columns[0]
+        master = pd.concat(
+            [c.set_index(c.columns[0]) for c in columns], axis=1, join="outer"
+        )
+        master.index.name = key_col
+        return master.sort_index().reset_index()
+
+    def write_master(self, cable_type: str, attr: str):
+        if self.master_dir is None:
+            return None
+        master = self.master_table(cable_type, attr)
+        if master is None:
+            return None
+        self.master_dir.mkdir(parents=True, exist_ok=True)
+        path = self.master_dir / f"{cable_type.lower()}_{attr}.csv"
+        # Write then rename, so readers never see a half-written table
+        tmp = path.with_suffix(".csv.tmp")
+        master.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def run(self, interval: float = 1.0, stop_event=None, on_poll=None):
+        """Poll until `stop_event` is set (or forever); `on_poll(summary)` after each poll."""
+        while stop_event is None or not stop_event.is_set():
+            summary = self.poll_once()
+            if on_poll:
+                on_poll(summary)
+            if stop_event is not None:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
+
+    @staticmethod
+    def _snapshot(cable) -> dict:
+        """Each measurement DataFrame, to see which ones an ingest replaced."""
+        if cable is None:
+            return {}
+        return {attr: getattr(cable, attr, None) for attr in MEASUREMENT_ATTRS}
+
+    @staticmethod
+    def _serial_hint(path):
+        info = identify_cable(os.path.basename(path))
+        return info[0] if info else None